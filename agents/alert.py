@@ -1,6 +1,9 @@
 
+import logging
+
+logger = logging.getLogger(__name__)
+
+
 class AlertAgent:
     def send_alert(self, log_line, parsed):
-        print("\n KRİTİK OLAY ALGILANDI!")
-        print(f"Log: {log_line}")
-        print(f"Detay: {parsed}")
+        logger.warning("KRİTİK OLAY ALGILANDI! Log: %s Detay: %s", log_line, parsed)
@@ -0,0 +1,371 @@
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from agents.collector import CollectorAgent
+from agents.parser import compile_parser
+from agents.rollup import RollupCube
+from agents.sessions import RequestSessionizer, _ms
+from agents.sketches import DDSketch, HyperLogLog
+
+SHARD_PARSE_CHUNK = 1024
+
+
+def is_error_log(log):
+    return "ERROR=" in log or ": ERROR " in log
+
+
+def _new_user_stats():
+    return {"total": 0, "error": 0, "duration_sum": 0, "duration_count": 0}
+
+
+def _new_duration_bucket():
+    return [0, 0]  # toplam, adet
+
+
+class AnalyticsEngine:
+    """
+    "EK ANALİZ" metriklerini tek geçişte hesaplar.
+    Her satır bir kez okunur; zaman damgası, REQUESTID, DURATION, ERROR, USER
+    ve servis alanları config'e göre derlenmiş LogParser ile çıkarılıp tüm
+    toplamlar güncellenir.
+    """
+
+    def __init__(self, duration_threshold=1000, parser=None, session_gap_seconds=1800):
+        self.duration_threshold = duration_threshold
+        self.parser = parser or compile_parser()
+        self.total_logs = 0
+        self.error_logs = 0
+
+        self._first_time = None  # ilk satırın zaman damgası (parça birleştirmede sınır farkı için)
+        self._previous_time = None
+        self.delta_count = 0
+        self.delta_sum = timedelta(0)
+        self.delta_min = None
+        self.delta_max = None
+
+        # REQUESTID oturumları; session_gap_seconds boyunca kaydı gelmeyen oturum kapanır
+        self.sessions = RequestSessionizer(timedelta(seconds=session_gap_seconds))
+
+        self.duration_count = 0
+        self.duration_sum = 0
+        self.duration_min = None
+        self.duration_max = None
+        self.duration_above_threshold = 0
+
+        self.minute_counts = Counter()
+        self.minute_errors = Counter()
+        self.minute_durations = defaultdict(_new_duration_bucket)
+        self.error_messages = Counter()
+        self.user_stats = defaultdict(_new_user_stats)
+        self.rollup = RollupCube()
+
+        self.duration_sketch = DDSketch()
+        self.endpoint_duration_sketches = {}  # servis -> DDSketch
+        self.distinct_users = HyperLogLog()
+        self.distinct_requests = HyperLogLog()
+
+    def update(self, log, parsed=None):
+        """parsed verilmezse satır bu motorun parser'ı ile ayrıştırılır."""
+        if parsed is None:
+            parsed = self.parser(log)
+        ts = parsed["timestamp"]
+        is_error = is_error_log(log) or bool(parsed["error"])
+        if not self.total_logs:
+            self._first_time = ts
+        self.total_logs += 1
+        if is_error:
+            self.error_logs += 1
+
+        previous = self._previous_time
+        if previous and ts:
+            self._add_delta(ts - previous)
+        self._previous_time = ts
+
+        duration = parsed["duration"]
+        if duration is not None:
+            self.duration_count += 1
+            self.duration_sum += duration
+            if self.duration_min is None or duration < self.duration_min:
+                self.duration_min = duration
+            if self.duration_max is None or duration > self.duration_max:
+                self.duration_max = duration
+            if duration > self.duration_threshold:
+                self.duration_above_threshold += 1
+            self.duration_sketch.add(duration)
+            service = parsed["service"]
+            if service:
+                sketch = self.endpoint_duration_sketches.get(service)
+                if sketch is None:
+                    sketch = self.endpoint_duration_sketches[service] = DDSketch()
+                sketch.add(duration)
+
+        reqid = parsed["request_id"]
+        if reqid:
+            self.distinct_requests.add(reqid)
+
+        if ts:
+            if reqid:
+                self.sessions.update(reqid, ts)
+
+            bucket = ts.replace(second=0, microsecond=0)
+            self.minute_counts[bucket] += 1
+            if is_error:
+                self.minute_errors[bucket] += 1
+            if duration is not None:
+                stats = self.minute_durations[bucket]
+                stats[0] += duration
+                stats[1] += 1
+
+        message = parsed["error"]
+        if message:
+            self.error_messages[message] += 1
+
+        user = parsed["user"]
+        if user:
+            self.distinct_users.add(user)
+            stats = self.user_stats[user]
+            stats["total"] += 1
+            if is_error:
+                stats["error"] += 1
+            if duration is not None:
+                stats["duration_sum"] += duration
+                stats["duration_count"] += 1
+
+        self.rollup.add(ts, parsed["service"], user, is_error, duration, message)
+
+    def consume(self, logs, parsed_logs=None):
+        """
+        Satırları LogParser.parse_many ile toplu ayrıştırıp işler; satırlar
+        zaten ayrıştırılmışsa sonuçlar parsed_logs ile verilir (değiştirilmez).
+        """
+        logs = list(logs)
+        if parsed_logs is None:
+            parsed_logs = self.parser.parse_many(logs)
+        for log, parsed in zip(logs, parsed_logs):
+            self.update(log, parsed)
+        return self
+
+    def _add_delta(self, delta):
+        self.delta_count += 1
+        self.delta_sum += delta
+        if self.delta_min is None or delta < self.delta_min:
+            self.delta_min = delta
+        if self.delta_max is None or delta > self.delta_max:
+            self.delta_max = delta
+
+    def merge(self, other):
+        """
+        Dosyada bu motordan hemen sonra gelen satırları işlemiş bir motoru
+        ekler. Parçalar dosya sırasıyla birleştirilirse sonuç, tüm satırların
+        tek motorda işlenmesiyle birebir aynıdır.
+        """
+        if not other.total_logs:
+            return self
+        if not self.total_logs:
+            self._first_time = other._first_time
+        elif self._previous_time and other._first_time:
+            self._add_delta(other._first_time - self._previous_time)
+        self._previous_time = other._previous_time
+        self.total_logs += other.total_logs
+        self.error_logs += other.error_logs
+
+        if other.delta_count:
+            self.delta_count += other.delta_count
+            self.delta_sum += other.delta_sum
+            if self.delta_min is None or other.delta_min < self.delta_min:
+                self.delta_min = other.delta_min
+            if self.delta_max is None or other.delta_max > self.delta_max:
+                self.delta_max = other.delta_max
+
+        self.sessions.merge(other.sessions)
+
+        if other.duration_count:
+            self.duration_count += other.duration_count
+            self.duration_sum += other.duration_sum
+            if self.duration_min is None or other.duration_min < self.duration_min:
+                self.duration_min = other.duration_min
+            if self.duration_max is None or other.duration_max > self.duration_max:
+                self.duration_max = other.duration_max
+            self.duration_above_threshold += other.duration_above_threshold
+
+        self.minute_counts.update(other.minute_counts)
+        self.minute_errors.update(other.minute_errors)
+        for bucket, (total, count) in other.minute_durations.items():
+            stats = self.minute_durations[bucket]
+            stats[0] += total
+            stats[1] += count
+        self.error_messages.update(other.error_messages)
+        for user, stats in other.user_stats.items():
+            mine = self.user_stats[user]
+            for key, value in stats.items():
+                mine[key] += value
+        self.rollup.merge(other.rollup)
+
+        self.duration_sketch.merge(other.duration_sketch)
+        for service, sketch in other.endpoint_duration_sketches.items():
+            mine = self.endpoint_duration_sketches.get(service)
+            if mine is None:
+                self.endpoint_duration_sketches[service] = mine = DDSketch(sketch.relative_accuracy)
+            mine.merge(sketch)
+        self.distinct_users.merge(other.distinct_users)
+        self.distinct_requests.merge(other.distinct_requests)
+        return self
+
+    def sketch_summary(self):
+        """DURATION yüzdelikleri (genel ve servis bazında) ve tahmini farklı değer sayıları."""
+        return {
+            "duration": self.duration_sketch.summary(),
+            "duration_by_endpoint": {
+                service: sketch.summary() for service, sketch in sorted(self.endpoint_duration_sketches.items())
+            },
+            "distinct_users": self.distinct_users.count(),
+            "distinct_request_ids": self.distinct_requests.count(),
+            "request_duration": self.sessions.summary(),
+        }
+
+    def duration_per_minute(self):
+        return {bucket: total / count for bucket, (total, count) in self.minute_durations.items() if count}
+
+    def print_report(self):
+        if self.delta_count:
+            avg = _ms(self.delta_sum) / self.delta_count
+            print(f"\n[EK ANALİZ] Ortalama loglar arası süre farkı: {avg:.2f} ms (min: {_ms(self.delta_min):.2f}, max: {_ms(self.delta_max):.2f})")
+
+        request_stats = self.sessions.summary()
+        if request_stats["count"]:
+            print(f"[EK ANALİZ] Ortalama işlem (REQUESTID) süresi: {request_stats['avg']:.2f} ms (min: {request_stats['min']:.2f}, max: {request_stats['max']:.2f})")
+
+        if self.duration_count:
+            print(f"[EK ANALİZ] DURATION ortalaması: {self.duration_sum/self.duration_count:.2f} ms, max: {self.duration_max} ms, min: {self.duration_min} ms")
+            print(f"[EK ANALİZ] {self.duration_threshold} ms üstü DURATION sayısı: {self.duration_above_threshold}")
+            sketch = self.duration_sketch
+            print(f"[EK ANALİZ] DURATION yüzdelikleri: p50={sketch.quantile(0.5):.2f} ms, p95={sketch.quantile(0.95):.2f} ms, p99={sketch.quantile(0.99):.2f} ms")
+
+        if self.minute_counts:
+            most_common_time, most_common_count = self.minute_counts.most_common(1)[0]
+            print(f"[EK ANALİZ] En yoğun dakika: {most_common_time} ({most_common_count} log)")
+
+        if self.total_logs:
+            print(f"[EK ANALİZ] Toplam log: {self.total_logs}, Hata içeren log: {self.error_logs}, Hata oranı: {100*self.error_logs/self.total_logs:.2f}%\n")
+
+        if self.error_messages:
+            print("[EK ANALİZ] En çok görülen hata mesajları:")
+            for msg, count in self.error_messages.most_common(5):
+                print(f"  {msg}: {count} kez")
+
+        if self.user_stats:
+            print("[EK ANALİZ] Kullanıcıya özel istatistikler:")
+            for user, stats in self.user_stats.items():
+                avg_dur = stats['duration_sum']/stats['duration_count'] if stats['duration_count'] else 0
+                print(f"  {user}: Toplam={stats['total']}, Hata={stats['error']}, Ortalama DURATION={avg_dur:.2f} ms")
+        else:
+            print("[EK ANALİZ] Kullanıcı bilgisi bulunamadı.")
+
+        if self.minute_counts:
+            self._print_global_anomalies()
+
+    def _print_global_anomalies(self):
+        buckets = sorted(self.minute_counts)
+        log_counts = [self.minute_counts[b] for b in buckets]
+        error_counts = [self.minute_errors[b] for b in buckets]
+
+        log_mean = sum(log_counts)/len(log_counts)
+        log_std = (sum((x-log_mean)**2 for x in log_counts)/len(log_counts))**0.5
+        anomaly_threshold = log_mean + 3*log_std
+        anomalies = [(b, c) for b, c in zip(buckets, log_counts) if c > anomaly_threshold]
+        if anomalies:
+            print("[EK ANALİZ] Anomali tespiti: Beklenenden çok fazla log üretilen zaman dilimleri:")
+            for b, c in anomalies:
+                print(f"  {b}: {c} log (ortalama+3σ üstü)")
+        else:
+            print("[EK ANALİZ] Log yoğunluğunda belirgin bir anomali tespit edilmedi.")
+
+        error_ratios = [e/l if l else 0 for e, l in zip(error_counts, log_counts)]
+        error_mean = sum(error_ratios)/len(error_ratios)
+        error_std = (sum((x-error_mean)**2 for x in error_ratios)/len(error_ratios))**0.5
+        error_anomaly_threshold = error_mean + 3*error_std
+        error_anomalies = [(b, r) for b, r in zip(buckets, error_ratios) if r > error_anomaly_threshold]
+        if error_anomalies:
+            print("[EK ANALİZ] Hata oranı anomalisi: Beklenenden yüksek hata oranı olan zaman dilimleri:")
+            for b, r in error_anomalies:
+                print(f"  {b}: {r*100:.2f}% hata oranı (ortalama+3σ üstü)")
+        else:
+            print("[EK ANALİZ] Hata oranında belirgin bir anomali tespit edilmedi.")
+
+    def plot_time_series(self, path="results/log_error_timeseries.png"):
+        if not self.minute_counts:
+            return None
+        import matplotlib.pyplot as plt
+
+        buckets = sorted(self.minute_counts)
+        plt.figure(figsize=(10,5))
+        plt.plot(buckets, [self.minute_counts[b] for b in buckets], label='Log Sayısı')
+        plt.plot(buckets, [self.minute_errors[b] for b in buckets], label='Hata Sayısı')
+        plt.xlabel('Zaman (dakika)')
+        plt.ylabel('Adet')
+        plt.title('Zaman Serisi: Log ve Hata Sayısı')
+        plt.legend()
+        plt.tight_layout()
+        plt.savefig(path)
+        plt.close()
+        print(f"[EK ANALİZ] Zaman serisi grafiği '{path}' olarak kaydedildi.")
+        return path
+
+
+def analyze_range(path, start, end, config, duration_threshold=1000):
+    """Bir bayt aralığındaki hata loglarını ayrı bir motorda işler (işçi süreç)."""
+    engine = AnalyticsEngine(
+        duration_threshold=duration_threshold, parser=compile_parser(config),
+        session_gap_seconds=config.get("session_gap_seconds", 1800),
+    )
+    chunk = []
+    for log in CollectorAgent().stream(path, encoding=config.get("encoding", "utf-8"), start=start, end=end):
+        if is_error_log(log):
+            chunk.append(log)
+            if len(chunk) >= SHARD_PARSE_CHUNK:
+                engine.consume(chunk)
+                chunk = []
+    return engine.consume(chunk)
+
+
+def analyze_sharded(path, config, workers=None, executor=None, duration_threshold=1000, start=0, end=None):
+    """
+    Dosyanın [start, end) bayt aralığını satır sonlarına hizalı parçalara
+    bölüp her parçayı ayrı bir süreçte işler; kısmi sonuçlar dosya sırasıyla
+    birleştirilir, böylece sonuç seri işlemle aynıdır. executor verilmezse
+    geçici bir ProcessPoolExecutor açılır.
+    """
+    workers = workers or os.cpu_count() or 1
+    config = dict(config)
+    parser = compile_parser(config)
+    if parser.needs_header and os.path.exists(path):
+        # CSV başlığı ilk dolu satırdır; işçilere sütun listesi olarak verilir.
+        header_end = 0
+        with open(path, "rb") as f:
+            for raw in iter(f.readline, b""):
+                header_end += len(raw)
+                header = raw.decode(config.get("encoding", "utf-8"), errors="replace").strip()
+                if header:
+                    parser.set_header(header)
+                    config["csv_columns"] = parser.columns
+                    break
+        start = max(start, header_end)
+    ranges = CollectorAgent().shard_ranges(path, workers, start=start, end=end) if os.path.exists(path) else []
+
+    engine = AnalyticsEngine(
+        duration_threshold=duration_threshold, parser=parser,
+        session_gap_seconds=config.get("session_gap_seconds", 1800),
+    )
+    if not ranges:
+        return engine
+    pool = executor or ProcessPoolExecutor(max_workers=min(workers, len(ranges)))
+    try:
+        futures = [pool.submit(analyze_range, path, s, e, config, duration_threshold) for s, e in ranges]
+        for future in futures:
+            engine.merge(future.result())
+    finally:
+        if executor is None:
+            pool.shutdown()
+    return engine
@@ -2,10 +2,74 @@
 from collections import Counter
 import numpy as np
 
+from agents.rollup import minute_datetime
+
+
+def rolling_mean_std(values, window):
+    """
+    Son eksen boyunca kayan pencere ortalaması ve standart sapması (ddof=0).
+    Kümülatif toplamlarla O(n) hesaplanır; 2-D girdide her satır ayrı bir seridir.
+    Çıktıların son ekseni n - window + 1 uzunluğundadır.
+    Tamsayı girdide varyans tam sayı aritmetiğiyle bulunur, böylece sabit
+    pencerelerde std tam olarak sıfır çıkar.
+    """
+    x = np.asarray(values)
+    pad = [(0, 0)] * (x.ndim - 1) + [(1, 0)]
+    if np.issubdtype(x.dtype, np.integer) or x.dtype == bool:
+        x = x.astype(np.int64)
+        c1 = np.pad(np.cumsum(x, axis=-1), pad)
+        c2 = np.pad(np.cumsum(x * x, axis=-1), pad)
+        s1 = c1[..., window:] - c1[..., :-window]
+        s2 = c2[..., window:] - c2[..., :-window]
+        spread = window * s2 - s1 * s1  # = window^2 * varyans, tam değer
+        return s1 / window, np.sqrt(spread) / window
+
+    x = x.astype(np.float64)
+    # Büyük ofsetlerde sayısal iptali azaltmak için seri ortalamasına göre kaydırılır
+    offset = x.mean(axis=-1, keepdims=True) if x.shape[-1] else 0.0
+    centered = x - offset
+    c1 = np.pad(np.cumsum(centered, axis=-1), pad)
+    c2 = np.pad(np.cumsum(centered * centered, axis=-1), pad)
+    mean = (c1[..., window:] - c1[..., :-window]) / window
+    var = (c2[..., window:] - c2[..., :-window]) / window - mean * mean
+    # Kümülatif toplam yuvarlama artığını sıfır varyans olarak kabul et
+    tolerance = np.finfo(np.float64).eps * 64 * np.maximum(
+        (c2[..., window:] - c2[..., :-window]) / window, 1.0
+    )
+    var = np.where(var <= tolerance, 0.0, var)
+    return mean + offset, np.sqrt(var)
+
+
+def rolling_anomaly_mask(values, window, threshold):
+    """
+    Her noktanın kendi penceresindeki ortalama + threshold * std değerini aşıp
+    aşmadığını gösteren boolean maske. std sıfır olan pencereler ve ilk
+    window - 1 nokta anomali sayılmaz.
+    """
+    x = np.asarray(values)
+    mask = np.zeros(x.shape, dtype=bool)
+    if x.shape[-1] < window:
+        return mask
+    mean, std = rolling_mean_std(x, window)
+    current = x[..., window - 1:]
+    mask[..., window - 1:] = (std > 0) & (current > mean + threshold * std)
+    return mask
+
+
+def anomaly_report(anomalies, error_message_anomalies, duration_anomalies, threshold):
+    """Anomali listelerini report.json'daki metin biçimine çevirir."""
+    return {
+        "anomalies": [f"{ts}: {count} log (kayan pencere anomali)" for ts, count in anomalies],
+        "error_message_anomalies": [f"{msg}: {count} kez" for msg, count in error_message_anomalies],
+        "duration_anomalies": [f"{ts}: {val:.2f} ms (ortalama+{threshold}σ üstü)" for ts, val in duration_anomalies],
+    }
+
+
 class AnomalyAgent:
     def __init__(self):
         self.anomalies = []
         self.error_message_anomalies = []
+        self.duration_anomalies = []
 
     def detect_time_series_anomalies(self, time_series, window=5, threshold=3.0):
         """
@@ -16,21 +80,78 @@ class AnomalyAgent:
         counts = np.array([time_series[b] for b in buckets])
         if len(counts) < window:
             return []
-        anomalies = []
-        for i in range(window - 1, len(counts)):
-            window_slice = counts[i - window + 1:i + 1]
-            mean = np.mean(window_slice)
-            std = np.std(window_slice)
-            if std == 0:
-                continue  # Standart sapma sıfırsa anomaliye bakılmaz
-            if counts[i] > mean + threshold * std:
-                anomalies.append((buckets[i], counts[i]))
+        mask = rolling_anomaly_mask(counts, window, threshold)
+        anomalies = [(buckets[i], counts[i]) for i in np.flatnonzero(mask)]
         self.anomalies = anomalies
         return anomalies
 
+    def detect_duration_anomalies(self, avg_duration_per_bucket, window=5, threshold=3.0):
+        """Dakikalık ortalama DURATION serisinde kayan pencere anomalileri."""
+        buckets = sorted(avg_duration_per_bucket.keys())
+        values = np.array([avg_duration_per_bucket[b] for b in buckets], dtype=np.float64)
+        mask = rolling_anomaly_mask(values, window, threshold)
+        anomalies = [(buckets[i], values[i]) for i in np.flatnonzero(mask)]
+        self.duration_anomalies = anomalies
+        return anomalies
+
+    def detect_matrix_anomalies(self, matrix, window=5, threshold=3.0):
+        """
+        Aynı zaman eksenini paylaşan çok sayıda seriyi (servis, endpoint,
+        kullanıcı...) tek çağrıda inceler. matrix: (seri sayısı, kova sayısı).
+        Anomali olan (satır, sütun) indekslerini döner.
+        """
+        mask = rolling_anomaly_mask(np.atleast_2d(matrix), window, threshold)
+        return np.argwhere(mask)
+
+    def detect_series_anomalies(self, series_by_key, window=5, threshold=3.0, fill_value=0):
+        """
+        series_by_key: {anahtar: {kova: değer}}. Seriler ortak, sıralı bir kova
+        eksenine hizalanır (eksik kovalar fill_value ile doldurulur) ve
+        detect_matrix_anomalies ile birlikte değerlendirilir.
+        """
+        keys = list(series_by_key)
+        if not keys:
+            return {}
+        buckets = sorted({b for series in series_by_key.values() for b in series})
+        column = {b: i for i, b in enumerate(buckets)}
+        values = [v for series in series_by_key.values() for v in series.values()]
+        dtype = np.result_type(np.asarray(values), np.asarray(fill_value))
+        matrix = np.full((len(keys), len(buckets)), fill_value, dtype=dtype)
+        for row, key in enumerate(keys):
+            for bucket, value in series_by_key[key].items():
+                matrix[row, column[bucket]] = value
+        result = {}
+        for row, col in self.detect_matrix_anomalies(matrix, window=window, threshold=threshold):
+            result.setdefault(keys[row], []).append((buckets[col], matrix[row, col]))
+        return result
+
     def detect_error_message_anomalies(self, error_messages, min_count=10):
         # error_messages: list of error message strings
         counter = Counter(error_messages)
         anomalies = [(msg, count) for msg, count in counter.items() if count > min_count]
         self.error_message_anomalies = anomalies
-        return anomalies
\ No newline at end of file
+        return anomalies
+
+    def evaluate_rollup(self, rollup, window=5, threshold=3.0, min_count=10):
+        """
+        Kaydedilmiş bir RollupCube üzerinde log sayısı, hata mesajı ve DURATION
+        anomalilerini yeniden hesaplar; LLM ya da log dosyası gerekmez.
+        """
+        minutes, counts = rollup.minute_series("count")
+        mask = rolling_anomaly_mask(counts, window, threshold)
+        self.anomalies = [(minute_datetime(minutes[i]), counts[i]) for i in np.flatnonzero(mask)]
+
+        _, duration_sum = rollup.minute_series("duration_sum")
+        _, duration_count = rollup.minute_series("duration_count")
+        has_duration = duration_count > 0
+        duration_minutes = minutes[has_duration]
+        averages = duration_sum[has_duration] / duration_count[has_duration]
+        mask = rolling_anomaly_mask(averages, window, threshold)
+        self.duration_anomalies = [(minute_datetime(duration_minutes[i]), averages[i]) for i in np.flatnonzero(mask)]
+
+        self.detect_error_message_anomalies(rollup.messages, min_count=min_count)
+        return {
+            "anomalies": self.anomalies,
+            "error_message_anomalies": self.error_message_anomalies,
+            "duration_anomalies": self.duration_anomalies,
+        }
@@ -0,0 +1,749 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+from statistics import NormalDist
+
+import httpx
+from langsmith import traceable
+
+from agents.jsonstream import JsonStreamDecoder
+from agents.parser import compile_parser, label_fields, valid_label
+from agents.similarity import normalize_log, get_log_hash, compact_log
+
+logger = logging.getLogger(__name__)
+
+_DIGITS_RE = re.compile(r"\d+")
+_CRITICAL_WORDS = ("timeout", "memory", "unauthorized", "bulunamadı", "failed", "fatal")
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+# Modelden istenen etiket alanları: alan -> (JSON şeması, istemdeki örnek değer)
+LABEL_FIELDS = {
+    "event_type": ({"type": "string"}, '"<kısa İngilizce olay türü, ör. Authentication Error>"'),
+    "is_critical": ({"type": "boolean"}, "<true|false>"),
+}
+
+
+class BackendError(RuntimeError):
+    """Model arka ucunun isteği yanıtlayamadığı durum (bağlantı, zaman aşımı vb.)."""
+
+
+def numbered_lines(log_lines):
+    return "\n".join(f"[{i}] {compact_log(line)}" for i, line in enumerate(log_lines))
+
+
+def field_hint(fields=None, index=False):
+    """İstemde gösterilecek örnek nesne: {"event_type": "<...>", "is_critical": <true|false>}."""
+    items = [f'"{field}": {LABEL_FIELDS[field][1]}' for field in fields or LABEL_FIELDS]
+    if index:
+        items.insert(0, '"index": <indeks>')
+    return "{" + ", ".join(items) + "}"
+
+
+def label_schema(fields=None, batch=False):
+    """Ollama `format` parametresi için yalnızca istenen alanları içeren JSON şeması."""
+    fields = list(fields or LABEL_FIELDS)
+    properties = {field: LABEL_FIELDS[field][0] for field in fields}
+    if batch:
+        properties = {"index": {"type": "integer"}, **properties}
+        fields = ["index"] + fields
+    schema = {"type": "object", "properties": properties, "required": fields}
+    return {"type": "array", "items": schema} if batch else schema
+
+
+def _only(label, fields):
+    return label if fields is None else {key: label[key] for key in fields if key in label}
+
+
+class OllamaBackend:
+    """
+    Yerel Ollama sunucusunun /api/generate ucuna giden varsayılan arka uç.
+
+    Yanıt `format` ile istenen alanların JSON şemasına kısıtlanır ve akış
+    olarak okunur. En üst düzey nesne ya da dizi kapandıktan sonra akış
+    `done` satırına kadar okunmaya devam eder ki bağlantı keep-alive havuzuna
+    dönsün; model bundan sonra `drain_lines` satırdan fazla üretirse bağlantı
+    kapatılır, böylece sunucu kalan token'ları üretmez. `num_predict` satır
+    başına `tokens_per_line` ile sınırlanır. Modele zaman damgası ve
+    REQUESTID çıkarılmış kısa satırlar gönderilir.
+    """
+
+    def __init__(self, prompt, batch_prompt, model="llama3.2", base_url=None, timeout=120.0,
+                 tokens_per_line=48, options=None, max_connections=8, drain_lines=8):
+        self.prompt = prompt
+        self.batch_prompt = batch_prompt
+        self.model = model
+        base_url = base_url or os.environ.get("OLLAMA_HOST") or "http://localhost:11434"
+        if "://" not in base_url:
+            base_url = f"http://{base_url}"
+        self.base_url = base_url.rstrip("/")
+        self.url = f"{self.base_url}/api/generate"
+        self.timeout = timeout
+        self.tokens_per_line = tokens_per_line
+        self.options = dict(options or {})
+        self.drain_lines = drain_lines
+        self.requests = 0
+        self.early_stops = 0  # model susmadan kapatılan akışlar
+        # Bağlantılar keep-alive havuzunda tutulur; erken kesilen akışın bağlantısı havuza dönmez.
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._client = httpx.Client(timeout=timeout, limits=self._limits)
+        self._async_client = None
+        self._async_loop = None
+        self._stale_async_clients = []  # aclose() çağrılmadan döngüsü biten istemciler
+
+    def health(self, timeout=2.0):
+        """Sunucu /api/version'a zamanında yanıt veriyorsa True."""
+        try:
+            return self._client.get(f"{self.base_url}/api/version", timeout=timeout).status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    async def aclose(self):
+        """Bu olay döngüsüne bağlı AsyncClient'ı kapatır; döngü kapanmadan çağrılmalıdır."""
+        client, self._async_client, self._async_loop = self._async_client, None, None
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        self._client.close()
+        if self._async_client is not None:
+            self._stale_async_clients.append(self._async_client)
+            self._async_client = self._async_loop = None
+        # Döngüsü bitmiş istemcilerin bağlantıları yeni bir döngüde bırakılır.
+        while self._stale_async_clients:
+            client = self._stale_async_clients.pop()
+            try:
+                asyncio.run(client.aclose())
+            except RuntimeError:
+                pass
+
+    def _payload(self, log_lines, fields, batch):
+        if batch:
+            prompt = self.batch_prompt.format(count=len(log_lines), log_lines=numbered_lines(log_lines),
+                                              fields=field_hint(fields, index=True))
+        else:
+            prompt = self.prompt.format(log_line=compact_log(log_lines[0]), fields=field_hint(fields))
+        options = {"num_predict": self.tokens_per_line * len(log_lines) + 16, **self.options}
+        return {"model": self.model, "prompt": prompt, "format": label_schema(fields, batch),
+                "stream": True, "options": options}
+
+    def _consume(self, decoder, line, trailing):
+        # Akıştaki bir NDJSON satırını işler; değer kapandıktan sonra gelen satır sayısını döner.
+        if not line:
+            return trailing
+        message = json.loads(line)
+        if message.get("error"):
+            raise BackendError(f"Ollama hatası: {message['error']}")
+        if decoder.done:
+            return trailing if message.get("done") else trailing + 1
+        decoder.feed(message.get("response", ""))
+        return trailing
+
+    def _stop(self, trailing):
+        # Değerden sonra model susmuyorsa bağlantı okunmamış yanıtla kapatılıp üretim kesilir.
+        if trailing > self.drain_lines:
+            self.early_stops += 1
+            return True
+        return False
+
+    def _generate(self, payload):
+        decoder = JsonStreamDecoder()
+        trailing = 0
+        self.requests += 1
+        try:
+            # Akış sonuna kadar okunan yanıtın bağlantısı havuza döner.
+            with self._client.stream("POST", self.url, json=payload) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    trailing = self._consume(decoder, line, trailing)
+                    if self._stop(trailing):
+                        break
+        except httpx.HTTPError as e:
+            raise BackendError(f"Ollama isteği başarısız: {e}") from e
+        return decoder.text
+
+    def _client_for_loop(self):
+        # AsyncClient oluşturulduğu olay döngüsüne bağlıdır; her analyze() yeni döngü açabilir.
+        # Çalıştırma sonunda aclose() ile kapatılır; kapatılmamış eski istemci close()'a kalır.
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            if self._async_client is not None:
+                self._stale_async_clients.append(self._async_client)
+            self._async_client = httpx.AsyncClient(timeout=self.timeout, limits=self._limits)
+            self._async_loop = loop
+        return self._async_client
+
+    async def _agenerate(self, payload):
+        decoder = JsonStreamDecoder()
+        trailing = 0
+        self.requests += 1
+        try:
+            async with self._client_for_loop().stream("POST", self.url, json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    trailing = self._consume(decoder, line, trailing)
+                    if self._stop(trailing):
+                        break
+        except httpx.HTTPError as e:
+            raise BackendError(f"Ollama isteği başarısız: {e}") from e
+        return decoder.text
+
+    @traceable(run_type="llm", name="Ollama")
+    def invoke(self, log_line, fields=None):
+        return self._generate(self._payload([log_line], fields, batch=False))
+
+    @traceable(run_type="llm", name="Ollama")
+    async def ainvoke(self, log_line, fields=None):
+        return await self._agenerate(self._payload([log_line], fields, batch=False))
+
+    @traceable(run_type="llm", name="Ollama")
+    def invoke_batch(self, log_lines, fields=None):
+        return self._generate(self._payload(log_lines, fields, batch=True))
+
+    @traceable(run_type="llm", name="Ollama")
+    async def ainvoke_batch(self, log_lines, fields=None):
+        return await self._agenerate(self._payload(log_lines, fields, batch=True))
+
+
+_DEFAULT_PARSER = compile_parser()
+
+
+def synthetic_label(log, parser=None):
+    """
+    Satırdan modele benzer, deterministik bir etiket üretir. Zaman, süre,
+    kaynak ve hata alanları LogParser/label_fields ile okunur (parser
+    verilmezse varsayılan biçim); olay türü hata mesajından türetilir.
+    """
+    fields = (parser or _DEFAULT_PARSER)(log)
+    message = (fields["error"] or "").strip()
+    if message.upper() == "NONE":
+        message = ""
+    event_type = _DIGITS_RE.sub("", message.split("|")[0]).strip(" :;")[:40].strip() if message else "Info"
+    label = {"event_type": event_type or "Unknown Error", **label_fields(fields)}
+    label.setdefault("has_error", False)
+    label.setdefault("user_action_successful", True)
+    label["is_critical"] = any(word in message.lower() for word in _CRITICAL_WORDS)
+    return label
+
+
+class _SimulatedBackend:
+    """Gecikme bekleme ve ortak çağrı sayacı; sync ve async çağrılar aynı ayarları kullanır."""
+
+    def __init__(self, latency_ms=0.0, per_line_ms=0.0, distribution="fixed", seed=None):
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Bilinmeyen gecikme dağılımı: {distribution}")
+        self.latency_ms = latency_ms
+        self.per_line_ms = per_line_ms
+        self.distribution = distribution
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _random(self):
+        with self._lock:
+            self.calls += 1
+            return self._rng.random(), self._rng.random()
+
+    def _delay(self, lines, draw):
+        mean = self.latency_ms + self.per_line_ms * lines
+        if mean <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            ms = 2 * mean * draw
+        elif self.distribution == "exponential":
+            ms = -mean * math.log1p(-min(draw, 1 - 1e-12))
+        elif self.distribution == "lognormal":
+            # Ortalaması `mean`, sigma=0.5 olan lognormal; draw ters CDF ile standart normale çevrilir.
+            z = NormalDist().inv_cdf(min(max(draw, 1e-12), 1 - 1e-12))
+            ms = mean * math.exp(0.5 * z - 0.125)
+        else:
+            ms = mean
+        return ms / 1000
+
+    def _wait(self, lines, draw):
+        delay = self._delay(lines, draw)
+        if delay:
+            time.sleep(delay)
+
+    async def _await(self, lines, draw):
+        delay = self._delay(lines, draw)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class SyntheticBackend(_SimulatedBackend):
+    """
+    Model sunucusu olmadan yük testi için sentetik arka uç.
+
+    Her çağrı seçilen dağılıma göre (`latency_ms` + satır başı `per_line_ms`
+    ortalamalı) bekler; `error_rate` olasılıkla BackendError fırlatır,
+    `malformed_rate` olasılıkla bozuk JSON (yarıda kesilmiş, açıklamayla
+    sarılmış ya da eksik satırlı) döner. Etiketler synthetic_label ile
+    (parser verilmişse o log biçimiyle) deterministiktir; seed aynıysa hata
+    ve bozulma dizisi de tekrarlanır.
+    """
+
+    def __init__(self, latency_ms=200.0, per_line_ms=20.0, distribution="lognormal",
+                 error_rate=0.0, malformed_rate=0.0, seed=None, parser=None):
+        super().__init__(latency_ms, per_line_ms, distribution, seed)
+        self.parser = parser
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.errors = 0
+        self.malformed = 0
+
+    def _render(self, payload, draw):
+        text = json.dumps(payload, ensure_ascii=False)
+        if draw >= self.malformed_rate:
+            return text
+        with self._lock:
+            self.malformed += 1
+        position = draw / self.malformed_rate * 3 if self.malformed_rate else 0.0
+        mode = int(position)
+        if mode == 0:
+            # Kesme noktası çekilişin kesirli kısmıyla değişir (token sınırına takılan çıktı gibi).
+            return text[: int(len(text) * (0.25 + 0.5 * (position - mode)))]
+        if mode == 1:
+            return f"İşte analiz sonucu:\n{text}\nUmarım yardımcı olur."
+        if isinstance(payload, list) and len(payload) > 1:
+            return json.dumps(payload[: len(payload) // 2], ensure_ascii=False)
+        return text.replace('"', "'")
+
+    def _respond(self, payload_fn, draw):
+        if draw < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            raise BackendError("Sentetik arka uç hatası")
+        # Hata ve bozulma aynı çekilişten bağımsız olsun diye yeniden ölçeklenir.
+        rescaled = (draw - self.error_rate) / (1 - self.error_rate) if self.error_rate < 1 else 1.0
+        return self._render(payload_fn(), rescaled)
+
+    def _labels(self, log_lines, fields):
+        return _indexed(_only(synthetic_label(line, self.parser), fields) for line in log_lines)
+
+    def invoke(self, log_line, fields=None):
+        latency_draw, draw = self._random()
+        self._wait(1, latency_draw)
+        return self._respond(lambda: _only(synthetic_label(log_line, self.parser), fields), draw)
+
+    async def ainvoke(self, log_line, fields=None):
+        latency_draw, draw = self._random()
+        await self._await(1, latency_draw)
+        return self._respond(lambda: _only(synthetic_label(log_line, self.parser), fields), draw)
+
+    def invoke_batch(self, log_lines, fields=None):
+        latency_draw, draw = self._random()
+        self._wait(len(log_lines), latency_draw)
+        return self._respond(lambda: self._labels(log_lines, fields), draw)
+
+    async def ainvoke_batch(self, log_lines, fields=None):
+        latency_draw, draw = self._random()
+        await self._await(len(log_lines), latency_draw)
+        return self._respond(lambda: self._labels(log_lines, fields), draw)
+
+
+def _indexed(labels):
+    return [{"index": i, **label} for i, label in enumerate(labels)]
+
+
+class ReplayBackend(_SimulatedBackend):
+    """
+    Kaydedilmiş etiketleri normalize log hash'ine göre geri oynatan arka uç.
+
+    Etiketler processed_labels.json'dan ya da SQLite etiket deposundan
+    yüklenir. Kaydı olmayan satırlar fallback arka ucuna (ör. SyntheticBackend)
+    gönderilir; fallback yoksa toplu yanıttan çıkarılır, tekil istekte boş
+    yanıt döner (LLMAgent bunu geçersiz JSON sayar). İsteğe bağlı gecikme
+    SyntheticBackend ile aynı biçimde ayarlanır.
+    """
+
+    def __init__(self, labels, fallback=None, latency_ms=0.0, per_line_ms=0.0, distribution="fixed", seed=None):
+        super().__init__(latency_ms, per_line_ms, distribution, seed)
+        self.labels = labels  # normalize log hash -> parsed
+        self.fallback = fallback
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_file(cls, path="processed_labels.json", **kwargs):
+        with open(path, "r") as f:
+            processed = json.load(f)
+        # Anahtarlar eski sürümlerde farklı hesaplanmış olabilir; hash logdan yeniden üretilir.
+        labels = {get_log_hash(entry["log"]): entry["parsed"] for entry in processed.values() if valid_label(entry["parsed"])}
+        return cls(labels, **kwargs)
+
+    @classmethod
+    def from_store(cls, store, **kwargs):
+        return cls({log_hash: entry["parsed"] for log_hash, entry in store.items() if valid_label(entry["parsed"])}, **kwargs)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _lookup(self, log_lines, fields=None):
+        found = {}
+        for i, line in enumerate(log_lines):
+            parsed = self.labels.get(get_log_hash(line, norm=normalize_log(line)))
+            if parsed is not None:
+                found[i] = _only(parsed, fields)
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(log_lines) - len(found)
+        return found
+
+    def _merge(self, log_lines, found, fallback_output):
+        items = [dict(parsed, index=i) for i, parsed in found.items()]
+        if fallback_output is not None:
+            missing = [i for i in range(len(log_lines)) if i not in found]
+            try:
+                extra = json.loads(fallback_output)
+            except json.JSONDecodeError:
+                extra = []
+            for item in extra if isinstance(extra, list) else [extra]:
+                if isinstance(item, dict) and type(item.get("index")) is int and 0 <= item["index"] < len(missing):
+                    items.append(dict(item, index=missing[item["index"]]))
+        return json.dumps(items, ensure_ascii=False)
+
+    def invoke(self, log_line, fields=None):
+        latency_draw, _ = self._random()
+        self._wait(1, latency_draw)
+        found = self._lookup([log_line], fields)
+        if found:
+            return json.dumps(found[0], ensure_ascii=False)
+        return self.fallback.invoke(log_line, fields=fields) if self.fallback is not None else ""
+
+    async def ainvoke(self, log_line, fields=None):
+        latency_draw, _ = self._random()
+        await self._await(1, latency_draw)
+        found = self._lookup([log_line], fields)
+        if found:
+            return json.dumps(found[0], ensure_ascii=False)
+        return await self.fallback.ainvoke(log_line, fields=fields) if self.fallback is not None else ""
+
+    def invoke_batch(self, log_lines, fields=None):
+        latency_draw, _ = self._random()
+        self._wait(len(log_lines), latency_draw)
+        found = self._lookup(log_lines, fields)
+        missing = [line for i, line in enumerate(log_lines) if i not in found]
+        fallback_output = None
+        if missing and self.fallback is not None:
+            fallback_output = self.fallback.invoke_batch(missing, fields=fields)
+        return self._merge(log_lines, found, fallback_output)
+
+    async def ainvoke_batch(self, log_lines, fields=None):
+        latency_draw, _ = self._random()
+        await self._await(len(log_lines), latency_draw)
+        found = self._lookup(log_lines, fields)
+        missing = [line for i, line in enumerate(log_lines) if i not in found]
+        fallback_output = None
+        if missing and self.fallback is not None:
+            fallback_output = await self.fallback.ainvoke_batch(missing, fields=fields)
+        return self._merge(log_lines, found, fallback_output)
+
+
+class _Endpoint:
+    __slots__ = ("name", "backend", "max_concurrency", "outstanding", "failures", "open_until",
+                 "trial", "requests", "errors", "latency")
+
+    def __init__(self, name, backend, max_concurrency):
+        self.name = name
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.outstanding = 0
+        self.failures = 0      # art arda başarısız istek
+        self.open_until = 0.0  # devre açıksa bu ana kadar istek gönderilmez
+        self.trial = False     # yarı açık devrede deneme isteği sürüyor
+        self.requests = 0
+        self.errors = 0
+        self.latency = None    # başarılı isteklerin üstel ortalama süresi (sn)
+
+
+class BackendPool:
+    """
+    Birden fazla model arka ucuna (ör. ayrı makinelerdeki Ollama sunucuları)
+    yük dağıtan havuz; LLMAgent için tek bir arka uç gibi davranır.
+
+    Her istek, kapasitesine göre en az bekleyen isteği olan (outstanding /
+    max_concurrency) uç noktaya gider; tüm uçlar doluysa biri boşalana kadar
+    beklenir. Art arda `failure_threshold` hata veren ya da sağlık kontrolünü
+    geçemeyen ucun devresi `cooldown_seconds` boyunca açılır; süre dolunca
+    tek bir deneme isteği başarılı olursa uç yeniden kullanılır. Hata alan
+    istek denenmemiş başka bir uca aktarılır, böylece yavaş ya da çökmüş bir
+    sunucu tüm çalışmayı durdurmaz. Sağlık kontrolü health() metodu olan
+    arka uçlar için `health_interval` saniyede bir arka planda çalışır.
+    """
+
+    def __init__(self, members, health_interval=10.0, failure_threshold=3, cooldown_seconds=15.0):
+        # members: [(ad, arka uç, en fazla eşzamanlı istek)]
+        self.endpoints = [_Endpoint(name, backend, max(1, int(limit))) for name, backend, limit in members]
+        if not self.endpoints:
+            raise ValueError("Arka uç havuzu boş olamaz")
+        self.health_interval = health_interval
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.metrics = None
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._async_condition = None
+        self._async_loop = None
+        self._stop = threading.Event()
+        self._health_thread = None
+
+    @property
+    def capacity(self):
+        return sum(endpoint.max_concurrency for endpoint in self.endpoints)
+
+    def _pick(self, exclude):
+        # Kilit altında çağrılır: (uç, kullanılabilir uç kaldı mı) döner.
+        now = time.monotonic()
+        best, best_load, usable = None, None, False
+        for endpoint in self.endpoints:
+            if endpoint in exclude:
+                continue
+            if endpoint.open_until:
+                if endpoint.open_until > now:
+                    continue
+                usable = True
+                if endpoint.trial:
+                    continue
+            usable = True
+            if endpoint.outstanding >= endpoint.max_concurrency:
+                continue
+            load = (endpoint.outstanding / endpoint.max_concurrency, endpoint.latency or 0.0)
+            if best is None or load < best_load:
+                best, best_load = endpoint, load
+        if best is not None:
+            best.outstanding += 1
+            best.requests += 1
+            if best.open_until:
+                best.trial = True
+        return best, usable
+
+    def _acquire(self, exclude):
+        self._start_health_checks()
+        with self._available:
+            while True:
+                endpoint, usable = self._pick(exclude)
+                if endpoint is not None:
+                    return endpoint
+                if not usable:
+                    raise BackendError("Kullanılabilir model arka ucu yok (tüm devreler açık)")
+                # Zaman aşımı, yarı açık duruma geçen devrelerin fark edilmesi içindir.
+                self._available.wait(timeout=1.0)
+
+    def _condition_for_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_condition = asyncio.Condition()
+            self._async_loop = loop
+        return self._async_condition
+
+    async def _aacquire(self, exclude):
+        self._start_health_checks()
+        condition = self._condition_for_loop()
+        async with condition:
+            while True:
+                with self._lock:
+                    endpoint, usable = self._pick(exclude)
+                if endpoint is not None:
+                    return endpoint
+                if not usable:
+                    raise BackendError("Kullanılabilir model arka ucu yok (tüm devreler açık)")
+                try:
+                    await asyncio.wait_for(condition.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _release(self, endpoint, ok, latency):
+        with self._available:
+            endpoint.outstanding -= 1
+            endpoint.trial = False
+            if ok:
+                endpoint.failures = 0
+                endpoint.latency = latency if endpoint.latency is None else endpoint.latency * 0.8 + latency * 0.2
+                if endpoint.open_until:
+                    endpoint.open_until = 0.0
+                    logger.info("Model arka ucu yeniden kullanılıyor: %s", endpoint.name)
+            else:
+                endpoint.errors += 1
+                endpoint.failures += 1
+                if endpoint.open_until or endpoint.failures >= self.failure_threshold:
+                    self._open(endpoint, "art arda %d hata" % endpoint.failures)
+            self._available.notify_all()
+        self._count(endpoint, "ok" if ok else "error")
+
+    async def _arelease(self, endpoint, ok, latency):
+        self._release(endpoint, ok, latency)
+        condition = self._condition_for_loop()
+        async with condition:
+            condition.notify_all()
+
+    def _open(self, endpoint, reason):
+        # Kilit altında çağrılır.
+        if not endpoint.open_until or endpoint.open_until <= time.monotonic():
+            logger.warning("Model arka ucu devre dışı (%s): %s", reason, endpoint.name)
+            if self.metrics is not None:
+                self.metrics.inc("backend_circuit_opens_total", endpoint=endpoint.name)
+        endpoint.open_until = time.monotonic() + self.cooldown_seconds
+
+    def _count(self, endpoint, outcome):
+        if self.metrics is not None:
+            self.metrics.inc("backend_requests_total", endpoint=endpoint.name, outcome=outcome)
+
+    def _call(self, method, *args, **kwargs):
+        tried = set()
+        while True:
+            endpoint = self._acquire(tried)
+            start = time.perf_counter()
+            try:
+                result = getattr(endpoint.backend, method)(*args, **kwargs)
+            except Exception:
+                self._release(endpoint, False, time.perf_counter() - start)
+                tried.add(endpoint)
+                if len(tried) == len(self.endpoints):
+                    raise
+                continue
+            self._release(endpoint, True, time.perf_counter() - start)
+            return result
+
+    async def _acall(self, method, *args, **kwargs):
+        tried = set()
+        while True:
+            endpoint = await self._aacquire(tried)
+            start = time.perf_counter()
+            try:
+                result = await getattr(endpoint.backend, method)(*args, **kwargs)
+            except Exception:
+                await self._arelease(endpoint, False, time.perf_counter() - start)
+                tried.add(endpoint)
+                if len(tried) == len(self.endpoints):
+                    raise
+                continue
+            await self._arelease(endpoint, True, time.perf_counter() - start)
+            return result
+
+    def invoke(self, log_line, fields=None):
+        return self._call("invoke", log_line, fields=fields)
+
+    async def ainvoke(self, log_line, fields=None):
+        return await self._acall("ainvoke", log_line, fields=fields)
+
+    def invoke_batch(self, log_lines, fields=None):
+        return self._call("invoke_batch", log_lines, fields=fields)
+
+    async def ainvoke_batch(self, log_lines, fields=None):
+        return await self._acall("ainvoke_batch", log_lines, fields=fields)
+
+    def _start_health_checks(self):
+        if self._health_thread is not None or not self.health_interval:
+            return
+        if not any(hasattr(endpoint.backend, "health") for endpoint in self.endpoints):
+            return
+        with self._lock:
+            if self._health_thread is None:
+                self._health_thread = threading.Thread(target=self._health_loop, name="backend-health", daemon=True)
+                self._health_thread.start()
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            self.check_health()
+
+    def check_health(self):
+        """
+        health() metodu olan uçları yoklar: yanıt vermeyenin devresi açılır,
+        devresi açık olup yanıt veren uç hemen deneme isteğine açılır.
+        """
+        for endpoint in self.endpoints:
+            health = getattr(endpoint.backend, "health", None)
+            if health is None:
+                continue
+            healthy = health()
+            with self._available:
+                if not healthy:
+                    self._open(endpoint, "sağlık kontrolü")
+                elif endpoint.open_until > time.monotonic():
+                    endpoint.open_until = time.monotonic()
+                    self._available.notify_all()
+
+    def stats(self):
+        """Uç başına istek, hata, bekleyen istek, ortalama gecikme ve devre durumu."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "endpoint": endpoint.name,
+                    "max_concurrency": endpoint.max_concurrency,
+                    "outstanding": endpoint.outstanding,
+                    "requests": endpoint.requests,
+                    "errors": endpoint.errors,
+                    "latency_ms": round(endpoint.latency * 1000, 1) if endpoint.latency is not None else None,
+                    "circuit": "open" if endpoint.open_until > now else "half-open" if endpoint.open_until else "closed",
+                }
+                for endpoint in self.endpoints
+            ]
+
+    async def aclose(self):
+        for endpoint in self.endpoints:
+            aclose = getattr(endpoint.backend, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def close(self):
+        self._stop.set()
+        for endpoint in self.endpoints:
+            close = getattr(endpoint.backend, "close", None)
+            if close is not None:
+                close()
+
+
+def ollama_backend(prompt, batch_prompt, endpoints=None, health_interval=10.0, failure_threshold=3,
+                   cooldown_seconds=15.0, **options):
+    """
+    Tek bir OllamaBackend ya da `endpoints` verilmişse her uç için bir
+    OllamaBackend içeren BackendPool kurar. Uçlar URL ya da
+    {"url": ..., "max_concurrency": 4, ...} biçimindedir; diğer anahtarlar
+    (ör. model) o uç için ortak seçenekleri geçersiz kılar.
+    """
+    if not endpoints:
+        return OllamaBackend(prompt, batch_prompt, **options)
+    members = []
+    for endpoint in endpoints:
+        endpoint = {"url": endpoint} if isinstance(endpoint, str) else dict(endpoint)
+        url = endpoint.pop("url")
+        limit = endpoint.pop("max_concurrency", 4)
+        backend = OllamaBackend(prompt, batch_prompt, base_url=url, max_connections=limit, **{**options, **endpoint})
+        members.append((backend.base_url, backend, limit))
+    return BackendPool(members, health_interval=health_interval, failure_threshold=failure_threshold,
+                       cooldown_seconds=cooldown_seconds)
+
+
+def create_backend(config, label_store=None):
+    """
+    config["llm_backend"] ("ollama", "replay" ya da "synthetic") ve
+    config["llm_backend_options"] ile arka ucu kurar; "ollama" için None döner
+    (LLMAgent kendi istemleri ve aynı seçeneklerle ollama_backend kurar). Replay, "replay_source"
+    "store" ise etiket deposundan, aksi halde "replay_path" dosyasından
+    (varsayılan processed_labels.json) beslenir; "replay_fallback": "synthetic"
+    kaydı olmayan satırları sentetik arka uca yönlendirir.
+    """
+    name = config.get("llm_backend", "ollama")
+    options = dict(config.get("llm_backend_options") or {})
+    if name == "ollama":
+        return None
+    if name == "synthetic":
+        return SyntheticBackend(parser=compile_parser(config), **options)
+    if name == "replay":
+        source = options.pop("replay_source", "file")
+        path = options.pop("replay_path", "processed_labels.json")
+        fallback = options.pop("replay_fallback", None)
+        fallback_options = options.pop("fallback_options", {})
+        if fallback == "synthetic":
+            options["fallback"] = SyntheticBackend(parser=compile_parser(config), **fallback_options)
+        if source == "store" and label_store is not None:
+            return ReplayBackend.from_store(label_store, **options)
+        return ReplayBackend.from_file(path, **options)
+    raise ValueError(f"Bilinmeyen LLM arka ucu: {name}")
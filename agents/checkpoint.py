@@ -0,0 +1,150 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+HEAD_BYTES = 4096
+TAIL_BYTES = 4096
+
+# Birikmiş toplamları etkileyen ayarlar; biri değişirse kontrol noktası kullanılmaz.
+STATE_KEYS = (
+    "log_format", "timestamp_field", "service_field", "duration_field", "user_field",
+    "error_field", "requestid_field", "delimiter", "encoding", "csv_columns",
+    "session_gap_seconds", "report_streaming", "report_spill_path",
+    "critical_keywords", "critical_keywords_file",
+)
+
+
+def config_fingerprint(config, keys=STATE_KEYS):
+    payload = json.dumps({key: config.get(key) for key in keys}, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def checkpoint_path(directory, log_path):
+    """Her log dosyasının kendi manifesti olur: <ad>-<mutlak yol özeti>.json."""
+    digest = hashlib.blake2b(os.path.abspath(log_path).encode(), digest_size=4).hexdigest()
+    return os.path.join(directory, f"{os.path.basename(log_path)}-{digest}.json")
+
+
+def _digest(f, start, length):
+    f.seek(start)
+    return hashlib.blake2b(f.read(length), digest_size=16).hexdigest()
+
+
+def file_identity(path, offset):
+    """
+    Dosyanın ilk `offset` baytının kimliği: inode, aygıt, baştaki HEAD_BYTES
+    ve offset'ten önceki TAIL_BYTES baytın özetleri. Dosyaya yalnızca ekleme
+    yapıldıkça bu değerler değişmez.
+    """
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        head = min(HEAD_BYTES, offset)
+        tail = min(TAIL_BYTES, offset)
+        return {
+            "inode": stat.st_ino,
+            "device": stat.st_dev,
+            "offset": offset,
+            "head_bytes": head,
+            "head_hash": _digest(f, 0, head),
+            "tail_bytes": tail,
+            "tail_hash": _digest(f, offset - tail, tail),
+        }
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class Checkpoint:
+    """
+    Artımlı analiz için kontrol noktası.
+
+    Manifest (JSON) analiz edilen dosyanın kimliğini (file_identity) ve
+    işlenmiş son bayt konumunu, yanındaki pickle dosyası ise o konuma kadar
+    birikmiş toplamları tutar. resume() dosya aynıysa ve yalnızca sonuna
+    ekleme yapılmışsa kaldığı konumu ve toplamları döner; inode değişmişse
+    (döndürme), dosya kısalmışsa (truncate), işlenmiş baytlar değişmişse ya
+    da toplamları etkileyen ayarlar farklıysa nedeni loglayıp baştan başlatır.
+    """
+
+    def __init__(self, path="results/checkpoint.json"):
+        self.path = path
+        self.state_path = os.path.splitext(path)[0] + ".pkl"
+
+    def _load_manifest(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Kontrol noktası okunamadı (%s): %s", self.path, e)
+            return None
+
+    def _mismatch(self, manifest, path, fingerprint):
+        if manifest.get("version") != CHECKPOINT_VERSION:
+            return "sürüm farklı"
+        if manifest.get("path") != os.path.abspath(path):
+            return "farklı dosya"
+        if manifest.get("fingerprint") != fingerprint:
+            return "ayarlar değişti"
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return "dosya bulunamadı"
+        if (stat.st_ino, stat.st_dev) != (manifest["inode"], manifest["device"]):
+            return "dosya döndürülmüş (inode değişti)"
+        if stat.st_size < manifest["offset"]:
+            return "dosya kısaltılmış"
+        current = file_identity(path, manifest["offset"])
+        if (current["head_hash"], current["tail_hash"]) != (manifest["head_hash"], manifest["tail_hash"]):
+            return "işlenmiş içerik değişmiş"
+        return None
+
+    def resume(self, path, fingerprint):
+        """(başlangıç konumu, durum) döner; devam edilemiyorsa (0, None)."""
+        manifest = self._load_manifest()
+        if manifest is None:
+            return 0, None
+        reason = self._mismatch(manifest, path, fingerprint)
+        if reason:
+            logger.info("Kontrol noktası kullanılmıyor (%s); '%s' baştan işlenecek.", reason, path)
+            return 0, None
+        try:
+            with open(self.state_path, "rb") as f:
+                data = f.read()
+            if hashlib.blake2b(data, digest_size=16).hexdigest() != manifest.get("state_hash"):
+                raise ValueError("durum dosyası manifestle eşleşmiyor")
+            state = pickle.loads(data)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            logger.warning("Kontrol noktası durumu yüklenemedi (%s); dosya baştan işlenecek.", e)
+            return 0, None
+        return manifest["offset"], state
+
+    def save(self, path, identity, fingerprint, state):
+        """
+        Önce durum, sonra manifest atomik olarak yazılır; manifest durumun
+        özetini tuttuğundan arada kesilen bir kayıt eski manifestle eşleşmez.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        _write_atomic(self.state_path, data)
+        manifest = {
+            "version": CHECKPOINT_VERSION,
+            "path": os.path.abspath(path),
+            "fingerprint": fingerprint,
+            **identity,
+            "state": os.path.basename(self.state_path),
+            "state_hash": hashlib.blake2b(data, digest_size=16).hexdigest(),
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        _write_atomic(self.path, json.dumps(manifest, indent=2).encode())
@@ -0,0 +1,167 @@
+import math
+import re
+import threading
+import zlib
+from collections import Counter, deque
+from functools import lru_cache
+
+import numpy as np
+
+from agents.parser import valid_label
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+
+@lru_cache(maxsize=200000)
+def _feature(token, dim):
+    return zlib.crc32(token.encode()) & (dim - 1)
+
+
+def tokenize(norm):
+    """Harf dizileri ve ardışık ikilileri; sayılar ve kimlik rakamları özellik üretmez."""
+    words = _WORD_RE.findall(norm.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class LocalClassifier:
+    """
+    LLM etiketlerinden öğrenen hashed TF-IDF + en yakın merkez sınıflandırıcı.
+
+    Her normalize log, `dim` boyutlu hash uzayında (1 + log tf) * idf ağırlıklı
+    ve L2 normalize bir vektöre çevrilir; her event_type için örneklerin
+    ortalaması (normalize) merkez olarak tutulur. Tahmin, en yakın merkezle
+    kosinüs benzerliği `threshold`'u ve ikinci en yakınla farkı `margin`'i
+    geçiyorsa kabul edilir; aksi halde satır LLM'e gider. Yeni LLM etiketleri
+    add() ile biriktirilir ve her `retrain_every` etikette model yeniden
+    eğitilir. Eğitim sırasında tahminler önceki modelle sürer.
+    """
+
+    def __init__(self, dim=1 << 14, threshold=0.5, margin=0.2, min_class_examples=3,
+                 retrain_every=200, max_examples=50000):
+        self.dim = dim
+        self.threshold = threshold
+        self.margin = margin
+        self.min_class_examples = min_class_examples
+        self.retrain_every = retrain_every
+        self.examples = deque(maxlen=max_examples)  # (özellik indeksleri, sayılar, event_type, parsed)
+        self.pending = 0
+        self.trainings = 0
+        self._model = None  # (idf, merkezler (dim x sınıf), sınıflar, örnek etiketler)
+        self._lock = threading.Lock()
+        self._train_lock = threading.Lock()
+
+    @property
+    def trained(self):
+        return self._model is not None
+
+    def __len__(self):
+        return len(self.examples)
+
+    def _features(self, norm):
+        dim = self.dim
+        counts = {}
+        for token in tokenize(norm):
+            feature = _feature(token, dim)
+            counts[feature] = counts.get(feature, 0) + 1
+        if not counts:
+            return None, None
+        return np.fromiter(counts.keys(), np.int64, len(counts)), np.fromiter(counts.values(), np.float32, len(counts))
+
+    def add(self, norm, parsed, retrain=True):
+        """LLM etiketini eğitim kümesine ekler; retrain_every etikette bir modeli yeniler."""
+        if not valid_label(parsed):
+            return
+        event_type = parsed["event_type"]
+        indices, counts = self._features(norm)
+        if indices is None:
+            return
+        with self._lock:
+            self.examples.append((indices, counts, event_type, parsed))
+            self.pending += 1
+            due = retrain and self.pending >= self.retrain_every
+        if due:
+            self.retrain()
+
+    def load_store(self, store):
+        """Etiket deposundaki tüm kayıtlarla eğitir (geçersiz etiketler add'de atlanır)."""
+        for _, entry in store.items():
+            self.add(entry["norm"], entry["parsed"], retrain=False)
+        self.retrain()
+
+    def retrain(self, force=False):
+        """Bekleyen etiket varsa (ya da force) modeli yeniden eğitir; eğitim sürüyorsa atlar."""
+        if not self._train_lock.acquire(blocking=False):
+            return False
+        try:
+            with self._lock:
+                if not self.pending and not force:
+                    return False
+                examples = list(self.examples)
+                self.pending = 0
+            self._model = self._fit(examples)
+            self.trainings += 1
+            return True
+        finally:
+            self._train_lock.release()
+
+    def _fit(self, examples):
+        class_counts = Counter(example[2] for example in examples)
+        classes = sorted(c for c, n in class_counts.items() if n >= self.min_class_examples)
+        if len(classes) < 1:
+            return None
+        class_ids = {c: i for i, c in enumerate(classes)}
+        examples = [e for e in examples if e[2] in class_ids]
+        dim = self.dim
+
+        lengths = np.fromiter((len(e[0]) for e in examples), np.int64, len(examples))
+        indices = np.concatenate([e[0] for e in examples])
+        tf = 1.0 + np.log(np.concatenate([e[1] for e in examples]))
+        doc_ids = np.repeat(np.arange(len(examples)), lengths)
+        labels = np.fromiter((class_ids[e[2]] for e in examples), np.int64, len(examples))
+
+        df = np.bincount(indices, minlength=dim)  # örnek içinde özellikler tekildir
+        idf = (np.log((1.0 + len(examples)) / (1.0 + df)) + 1.0).astype(np.float32)
+
+        weights = tf * idf[indices]
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        norms = np.sqrt(np.add.reduceat(weights * weights, offsets))
+        weights = weights / norms[doc_ids]
+        centroids = np.bincount(labels[doc_ids] * dim + indices, weights=weights,
+                                minlength=len(classes) * dim).reshape(len(classes), dim)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        # Tahminde döndürülecek etiket: sınıfın en son görülen örneği.
+        prototypes = {}
+        for example in examples:
+            prototypes[example[2]] = example[3]
+        # Tahminde özellik satırları bitişik okunsun diye (dim, sınıf) biçiminde tutulur.
+        return idf, np.ascontiguousarray(centroids.T, dtype=np.float32), classes, [prototypes[c] for c in classes]
+
+    def predict(self, norm):
+        """
+        (parsed, benzerlik) döner; güven eşiğin altındaysa parsed None'dur.
+        Dönen parsed sınıfın örnek etiketinin kopyasıdır.
+        """
+        model = self._model
+        if model is None:
+            return None, 0.0
+        idf, centroids, classes, prototypes = model
+        indices, counts = self._features(norm)
+        if indices is None:
+            return None, 0.0
+        weights = (1.0 + np.log(counts)) * idf[indices]
+        norm_value = math.sqrt(float(weights @ weights))
+        if not norm_value:
+            return None, 0.0
+        scores = (weights / norm_value) @ centroids[indices]
+        if len(classes) == 1:
+            best, second = 0, None
+        else:
+            second, best = np.argpartition(scores, -2)[-2:]
+            if scores[second] > scores[best]:
+                best, second = second, best
+        score = float(scores[best])
+        gap = score - float(scores[second]) if second is not None else score
+        if score < self.threshold or gap < self.margin:
+            return None, score
+        return dict(prototypes[best]), score
@@ -1,3 +1,8 @@
+import logging
+import mmap
+import os
+
+logger = logging.getLogger(__name__)
 
 class CollectorAgent:
     def from_file(self, file_path="logs/server.txt"):
@@ -5,5 +10,71 @@ class CollectorAgent:
             with open(file_path, "r") as f:
                 return [line.strip() for line in f.readlines() if line.strip()]
         except FileNotFoundError:
-            print(f" Dosya bulunamadı: {file_path}")
+            logger.error("Dosya bulunamadı: %s", file_path)
+            return []
+
+    def stream(self, file_path="logs/server.txt", encoding="utf-8", start=0, end=None):
+        """
+        Dosyayı belleğe almadan, mmap üzerinden satır satır okuyan generator.
+        Boş satırlar atlanır; bellek kullanımı dosya boyutundan bağımsızdır.
+        start/end verilirse yalnızca [start, end) bayt aralığında başlayan
+        satırlar okunur (start bir satır başı olmalıdır).
+        """
+        try:
+            f = open(file_path, "rb")
+        except FileNotFoundError:
+            logger.error("Dosya bulunamadı: %s", file_path)
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            end = size if end is None else min(end, size)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                mm.seek(start)
+                position = start
+                for raw in iter(mm.readline, b""):
+                    if position >= end:
+                        break
+                    position += len(raw)
+                    line = raw.decode(encoding, errors="replace").strip()
+                    if line:
+                        yield line
+
+    def line_end(self, file_path, start=0):
+        """
+        [start, boyut) aralığındaki son satır sonundan sonraki bayt konumu; tam
+        satır yoksa start. Yazılmakta olan yarım satır bu konumun dışında kalır.
+        """
+        size = os.path.getsize(file_path)
+        if size <= start:
+            return start
+        with open(file_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                newline = mm.rfind(b"\n", start)
+        return start if newline == -1 else newline + 1
+
+    def shard_ranges(self, file_path, shards, start=0, end=None):
+        """
+        Dosyayı [start, end) aralığında (end verilmezse dosya sonuna kadar),
+        satır sonlarına hizalı en fazla `shards` adet (başlangıç, bitiş) bayt
+        aralığına böler.
+        """
+        size = os.path.getsize(file_path)
+        if end is not None:
+            size = min(end, size)
+        if size <= start:
             return []
+        bounds = [start]
+        with open(file_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for i in range(1, max(shards, 1)):
+                    target = max(start + (size - start) * i // shards, bounds[-1])
+                    newline = mm.find(b"\n", target)
+                    boundary = size if newline == -1 else newline + 1
+                    if boundary >= size:
+                        break
+                    if boundary > bounds[-1]:
+                        bounds.append(boundary)
+        bounds.append(size)
+        return list(zip(bounds, bounds[1:]))
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD eşzamanlılık sınırı.
+    Başarılı ve gecikmesi taban gecikmenin latency_tolerance katını aşmayan her
+    istek sınırı ~1/limit kadar artırır (tur başına +1). Hata ya da aşırı gecikme
+    sınırı backoff ile çarpar; aynı tıkanıklık için tekrar tekrar düşmemek adına
+    bir sonraki azaltma, o anda uçuştaki istekler tamamlanana kadar beklenir.
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=32, backoff=0.5, latency_tolerance=2.0):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.base_latency = None
+        self.completed = 0
+        self.errors = 0
+        self._cooldown = 0
+        self._condition = None
+
+    def _get_condition(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, latency, ok=True):
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            self.completed += 1
+            if not ok:
+                self.errors += 1
+            self._adjust(latency, ok)
+            condition.notify_all()
+
+    def _adjust(self, latency, ok):
+        if ok:
+            # Taban gecikme: gözlenen en düşük değer, yavaşça yukarı kayar
+            if self.base_latency is None or latency < self.base_latency:
+                self.base_latency = latency
+            else:
+                self.base_latency += (latency - self.base_latency) * 0.01
+        congested = not ok or (
+            self.base_latency is not None and latency > self.base_latency * self.latency_tolerance
+        )
+        if self._cooldown > 0:
+            self._cooldown -= 1
+        if congested:
+            if self._cooldown == 0:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._cooldown = self.in_flight + 1
+        else:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+
+class AsyncDispatcher:
+    """
+    Sınırlı kuyruklu asyncio iş hattı.
+    Üretici, senkron bir iterable'dan (ör. akış halindeki log partileri) öğeleri
+    bir iş parçacığında ilerletip kuyruğa koyar; kuyruk doluysa bekler (geri basınç). Tüketici, AdaptiveLimiter
+    izin verdikçe worker coroutine'ini başlatır ve her sonucu tamamlandığı anda
+    on_result'a iletir. metrics verilirse kuyruk derinliği ve eşzamanlılık
+    sınırı gösterge olarak güncellenir.
+    """
+
+    def __init__(self, worker, limiter=None, queue_size=64, on_result=None, on_failure=None, max_retries=2,
+                 metrics=None):
+        self.worker = worker
+        self.limiter = limiter or AdaptiveLimiter()
+        self.queue_size = queue_size
+        self.on_result = on_result
+        self.on_failure = on_failure
+        self.max_retries = max_retries
+        self.metrics = metrics
+        self.failed = 0
+
+    def run(self, items):
+        return asyncio.run(self.arun(items))
+
+    async def arun(self, items):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        done = object()
+
+        async def produce():
+            # Senkron iterable (dosya okuma, ayrıştırma, SQLite) döngüyü bloklamasın diye her
+            # öğe bir iş parçacığında ilerletilir; uçuştaki akışlar ve ölçülen gecikmeler etkilenmez.
+            iterator = iter(items)
+            try:
+                while True:
+                    item = await asyncio.to_thread(next, iterator, done)
+                    if item is done:
+                        break
+                    await queue.put(item)
+            finally:
+                await queue.put(done)
+
+        producer = asyncio.create_task(produce())
+        tasks = set()
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if self.metrics is not None:
+                self.metrics.set_gauge("llm_queue_depth", queue.qsize())
+            await self.limiter.acquire()
+            if self.metrics is not None:
+                self.metrics.set_gauge("llm_concurrency_limit", self.limiter.limit)
+            task = asyncio.create_task(self._run_one(item))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        await producer  # üreticide oluşan hata, başlatılmış istekler bittikten sonra yükselir
+
+    async def _run_one(self, item):
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                result = await self.worker(item)
+            except Exception as e:
+                await self.limiter.release(time.monotonic() - start, ok=False)
+                attempt += 1
+                if attempt > self.max_retries:
+                    self.failed += 1
+                    if self.metrics is not None:
+                        self.metrics.inc("llm_failed_batches_total")
+                    logger.warning("LLM isteği başarısız, parti atlanıyor: %s", e)
+                    if self.on_failure is not None:
+                        self.on_failure(item)
+                    return
+                await asyncio.sleep(0.5 * attempt)
+                await self.limiter.acquire()
+                continue
+            await self.limiter.release(time.monotonic() - start, ok=True)
+            if self.on_result is not None:
+                self.on_result(result)
+            return
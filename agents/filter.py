@@ -1,50 +1,121 @@
+import re
+from bisect import bisect_right
+
+DEFAULT_KEYWORDS = [
+    # Kimlik Doğrulama ve Yetkisizlik
+    "failed login",
+    "login failure",
+    "multiple failed login",
+    "unauthorized access",
+    "unauthorized access attempt",
+    "invalid credentials",
+    "authentication failure",
+
+    # Ağ ve Güvenlik
+    "port scan",
+    "ddos attack",
+    "firewall breach",
+    "suspicious activity",
+    "intrusion detected",
+
+    # Disk ve Donanım
+    "disk space low",
+    "disk warning",
+    "raid array degraded",
+    "hardware failure",
+
+    # Veritabanı Hataları
+    "connection timeout",
+    "database timeout",
+    "deadlock detected",
+    "sql exception",
+
+    # Uygulama Hataları
+    "unhandled exception",
+    "service unavailable",
+    "crash report",
+    "error while executing",
+
+    # Diğer sistemsel problemler
+    "out of memory",
+    "kernel panic",
+    "resource exhausted",
+    "reboot required"
+]
+
+
+def _trie_pattern(keywords):
+    """
+    Anahtar kelimeleri ortak önekleri paylaşan tek bir regex'e derler.
+    Yalnızca eşleşmenin varlığı önemli olduğundan, bir kelime bittiği düğümün
+    altındaki daha uzun kelimeler atlanır ("failed login" varken
+    "failed login attempt" ayrıca aranmaz).
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        if "" in node:
+            return ""
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return build(trie)
+
+
+def load_keywords(path):
+    """Satır başına bir kelime içeren dosyayı okur; boş ve # ile başlayan satırlar atlanır."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
 
 class FilterAgent:
-    def is_critical(self, parsed, log_line=""):
+    def __init__(self, keywords=None, keywords_file=None):
+        keywords = list(DEFAULT_KEYWORDS if keywords is None else keywords)
+        if keywords_file:
+            keywords.extend(load_keywords(keywords_file))
+        self.keywords = sorted({kw.lower() for kw in keywords if kw})
+        self._pattern = re.compile(_trie_pattern(self.keywords)) if self.keywords else None
+
+    @classmethod
+    def from_config(cls, config):
+        """Varsayılan listeye config'teki "critical_keywords" ve "critical_keywords_file" eklenir."""
+        return cls(
+            keywords=DEFAULT_KEYWORDS + list(config.get("critical_keywords", [])),
+            keywords_file=config.get("critical_keywords_file"),
+        )
+
+    def matches(self, log_line):
+        return self._pattern is not None and self._pattern.search(log_line.lower()) is not None
+
+    def is_critical(self, parsed, log_line="", keyword_hit=None):
+        """keyword_hit, satır classify_many ile önceden tarandıysa o sonuçtur."""
         if parsed.get("is_critical") is True:
             return True
+        return self.matches(log_line) if keyword_hit is None else keyword_hit
 
-        keywords = [
-            # Kimlik Doğrulama ve Yetkisizlik
-            "failed login",
-            "login failure",
-            "multiple failed login",
-            "unauthorized access",
-            "unauthorized access attempt",
-            "invalid credentials",
-            "authentication failure",
-
-            # Ağ ve Güvenlik
-            "port scan",
-            "ddos attack",
-            "firewall breach",
-            "suspicious activity",
-            "intrusion detected",
-
-            # Disk ve Donanım
-            "disk space low",
-            "disk warning",
-            "raid array degraded",
-            "hardware failure",
-
-            # Veritabanı Hataları
-            "connection timeout",
-            "database timeout",
-            "deadlock detected",
-            "sql exception",
-
-            # Uygulama Hataları
-            "unhandled exception",
-            "service unavailable",
-            "crash report",
-            "error while executing",
-
-            # Diğer sistemsel problemler
-            "out of memory",
-            "kernel panic",
-            "resource exhausted",
-            "reboot required"
-        ]
-
-        log_line = log_line.lower()
-        return any(kw in log_line for kw in keywords)
\ No newline at end of file
+    def classify_many(self, log_lines):
+        """
+        Bir satır grubunu tek regex taramasıyla sınıflandırır; her satır için
+        kritik anahtar kelime içerip içermediğini (bool) aynı sırayla döner.
+        """
+        # lower() bazı karakterlerde ("İ") uzunluğu değiştirdiği için ofsetler
+        # küçültülmüş satırlar üzerinden hesaplanır.
+        lowered = [line.lower() for line in log_lines]
+        flags = [False] * len(lowered)
+        if self._pattern is None or not lowered:
+            return flags
+        starts = []
+        offset = 0
+        for line in lowered:
+            starts.append(offset)
+            offset += len(line) + 1
+        # Anahtar kelimeler satır sonu içermediği için eşleşmeler satır sınırını aşmaz.
+        text = "\n".join(lowered)
+        for match in self._pattern.finditer(text):
+            flags[bisect_right(starts, match.start()) - 1] = True
+        return flags
@@ -0,0 +1,114 @@
+import json
+
+
+class JsonStreamDecoder:
+    """
+    Model çıktısını parça parça okuyup ilk en üst düzey JSON nesnesinin ya da
+    dizisinin nerede kapandığını bulan artımlı ayrıştırıcı.
+
+    Değerden önceki açıklama metni atlanır; feed() değer kapandığında True
+    döner ve sonraki parçalar yok sayılır, böylece çağıran taraf üretimi
+    orada durdurabilir. Çıktı yarıda kesilmişse salvage() tamamlanmış
+    üyeleri açık parantezleri kapatarak kurtarır.
+    """
+
+    def __init__(self):
+        self.done = False
+        self._parts = []
+        self._size = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._cut = None  # (uzunluk, kapanış parantezleri): son tamamlanmış üyenin sonu
+
+    @property
+    def started(self):
+        return bool(self._parts) or bool(self._stack)
+
+    @property
+    def text(self):
+        return "".join(self._parts)
+
+    def feed(self, chunk):
+        """Bir parça ekler; en üst düzey değer kapandıysa True döner."""
+        if self.done or not chunk:
+            return self.done
+        stack = self._stack
+        begin = 0 if stack else None
+        for i, ch in enumerate(chunk):
+            if not stack:
+                if ch == "{" or ch == "[":
+                    stack.append(ch)
+                    begin = i
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{" or ch == "[":
+                stack.append(ch)
+            elif ch == "}" or ch == "]":
+                stack.pop()
+                if not stack:
+                    self._append(chunk[begin:i + 1])
+                    self.done = True
+                    return True
+                self._cut = (self._size + i + 1 - begin, _closers(stack))
+            elif ch == ",":
+                self._cut = (self._size + i - begin, _closers(stack))
+        if begin is not None:
+            self._append(chunk[begin:])
+        return False
+
+    def _append(self, text):
+        self._parts.append(text)
+        self._size += len(text)
+
+    def value(self):
+        """Kapanmış değeri çözer; değer kapanmadıysa ya da geçersizse None döner."""
+        if not self.done:
+            return None
+        try:
+            return json.loads(self.text)
+        except json.JSONDecodeError:
+            return None
+
+    def salvage(self):
+        """
+        Kapanmış değeri ya da yarıda kalan değerin tamamlanmış kısmını döner.
+        Önce metin olduğu gibi kapatılmayı dener, olmazsa son virgül ya da
+        iç kapanıştan keser; ikisi de çözülemezse None döner.
+        """
+        if self.done:
+            return self.value()
+        if not self._stack:
+            return None
+        text = self.text
+        candidates = []
+        if not self._in_string:
+            candidates.append(text.rstrip().rstrip(",:") + _closers(self._stack))
+        if self._cut is not None:
+            length, closers = self._cut
+            candidates.append(text[:length] + closers)
+        for candidate in candidates:
+            try:
+                return json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+        return None
+
+
+def _closers(stack):
+    return "".join("}" if opener == "{" else "]" for opener in reversed(stack))
+
+
+def decode_first(text):
+    """Metindeki ilk JSON nesnesini ya da dizisini (gerekirse kurtararak) çözer; yoksa None."""
+    decoder = JsonStreamDecoder()
+    decoder.feed(text)
+    return decoder.salvage()
@@ -0,0 +1,134 @@
+import threading
+from concurrent.futures import Future
+
+from rapidfuzz import fuzz
+
+from agents.parser import valid_label
+from agents.similarity import SimilarityIndex, normalize_log, get_log_hash, log_template
+
+
+class LabelCache:
+    """
+    SimilarityIndex üzerine eşzamanlı kullanım için etiket önbelleği.
+
+    Okumalar kilitsizdir: SimilarityIndex.add bir kaydı önce normalize metniyle
+    birlikte, en son aday kovalarına yayınlar; böylece bir okuyucu kovada
+    gördüğü her hash'in verisini hazır bulur. Yazmalar tek bir kilitle sıralanır.
+
+    Aynı şablona ait loglar için tek LLM çağrısı yapılır (singleflight): ilk
+    claim eden sahip olur, diğerleri sahibin resolve ettiği sonucu bekler.
+
+    store (LogCacheManager) verilirse bellek indeksi yalnızca bir sıcak katmandır:
+    bellekte bulunamayan loglar kalıcı depoda hash, şablon ve LSH anahtarlarıyla
+    aranır, bulunan kayıt belleğe alınır. Yeni etiketler depoya anında yazılır.
+    Geçersiz (yer tutucu) etiketler içe aktarılmaz; depoda bulunanlar silinir,
+    böylece o loglar yeniden etiketlenir.
+    """
+
+    def __init__(self, index=None, threshold=90, store=None):
+        self.index = index or SimilarityIndex(threshold=threshold)
+        self.store = store
+        self._write_lock = threading.Lock()
+        self._inflight_lock = threading.Lock()
+        self._inflight = {}
+        self.coalesced = 0
+
+    @property
+    def entries(self):
+        return self.index.entries
+
+    def __len__(self):
+        return len(self.index)
+
+    def load(self, processed_logs):
+        """processed_labels.json biçimindeki kayıtları önbelleğe (ve depoya) ekler."""
+        for log_hash, entry in processed_logs.items():
+            if not valid_label(entry.get("parsed")):
+                continue
+            self.add(entry["log"], entry["parsed"], log_hash=log_hash)
+
+    def lookup(self, log, log_hash=None, norm=None):
+        if norm is None:
+            norm = normalize_log(log)
+        if log_hash is None:
+            log_hash = get_log_hash(log, norm=norm)
+        match, kind = self.index.find(norm, log_hash)
+        if match is not None:
+            if self.store is not None:
+                self.store.touch(match)
+            return self.index.entries[match], kind
+        if self.store is None:
+            return None, None
+
+        entry, kind, match = self._lookup_store(log_hash, norm, self.index.signature_keys(norm))
+        if entry is None:
+            return None, None
+        self.store.touch(match)
+        with self._write_lock:
+            self.index.add(entry["log"], entry["parsed"], log_hash=match, norm=entry["norm"])
+        return entry, kind
+
+    def _lookup_store(self, log_hash, norm, keys):
+        entry = self.store.get(log_hash)
+        if entry is not None:
+            if valid_label(entry["parsed"]):
+                return entry, "exact", log_hash
+            self.store.delete([log_hash])
+        for kind, candidates in (
+            ("template", lambda: self.store.by_template(log_template(norm))),
+            ("fuzzy", lambda: self.store.by_signature(keys)),
+        ):
+            best, best_score = None, 0
+            invalid = []
+            for candidate_hash, candidate in candidates():
+                if not valid_label(candidate["parsed"]):
+                    invalid.append(candidate_hash)
+                    continue
+                score = self.index.score(norm, candidate["norm"])
+                if score > best_score:
+                    best, best_score = (candidate_hash, candidate), score
+            self.store.delete(invalid)
+            if best is not None:
+                return best[1], kind, best[0]
+        return None, None, log_hash
+
+    def add(self, log, parsed, log_hash=None, norm=None):
+        if norm is None:
+            norm = normalize_log(log)
+        if log_hash is None:
+            log_hash = get_log_hash(log, norm=norm)
+        keys = self.index.signature_keys(norm)
+        if self.store is not None:
+            self.store.put(log_hash, log, norm, parsed, log_template(norm), signature_keys=keys)
+        with self._write_lock:
+            return self.index.add(log, parsed, log_hash=log_hash, norm=norm, keys=keys)
+
+    def flight_key(self, norm):
+        return log_template(norm)
+
+    def claim(self, key):
+        """
+        (future, sahip_mi) döner. Sahip olan çağıran LLM'i çalıştırıp
+        resolve etmekle yükümlüdür; diğerleri future.result() ile bekler.
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def resolve(self, key, entry):
+        """Sahibin sonucunu (ya da başarısızlıkta None) bekleyenlere iletir."""
+        with self._inflight_lock:
+            future = self._inflight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(entry)
+
+    def accepts(self, norm, entry):
+        """Bekleyen bir logun, sahibin sonucunu kullanıp kullanamayacağı."""
+        if entry is None:
+            return False
+        return fuzz.ratio(norm, entry["norm"], score_cutoff=self.index.threshold) >= self.index.threshold
@@ -1,33 +1,262 @@
-from langchain_community.llms import Ollama
+import re
+import json
+import time
+
 from langchain_core.prompts import PromptTemplate
 
+from agents.backends import ollama_backend, LABEL_FIELDS
+from agents.jsonstream import decode_first
+from agents.parser import valid_event_type, valid_label
+
+_JSON_OBJECT_RE = re.compile(r"\{[^{}]+\}", re.DOTALL)
+
+_FIELD_CHECKS = {
+    "event_type": valid_event_type,
+    "is_critical": lambda value: isinstance(value, bool),
+}
+
+
+def missing_fields(parsed, fields=tuple(LABEL_FIELDS)):
+    """Etikette eksik ya da geçersiz olan model alanları (sırayla)."""
+    return [field for field in fields if not _FIELD_CHECKS[field](parsed.get(field))]
+
+
+def _usable(parsed, fields):
+    # Geçersiz alanlar silinir ki yeniden sorulan değerlerle birleştirilebilsin;
+    # istenen alanların hiçbiri geçerli değilse None döner.
+    if not isinstance(parsed, dict):
+        return None
+    missing = missing_fields(parsed, fields)
+    if len(missing) == len(fields):
+        return None
+    for field in missing:
+        parsed.pop(field, None)
+    return parsed
+
+
+def parse_json_object(llm_output):
+    """LLM çıktısından tek bir JSON nesnesi çıkarır; bulunamazsa None döner."""
+    return _parse_json_object(llm_output)[0]
+
+
+def _parse_json_object(llm_output):
+    # (nesne, yedek_yol_kullanıldı_mı)
+    fallback = False
+    try:
+        parsed = json.loads(llm_output)
+    except json.JSONDecodeError:
+        fallback = True
+        # Açıklamayla sarılmış ya da yarıda kesilmiş çıktıdan ilk nesnenin tamamlanmış alanları
+        parsed = decode_first(llm_output)
+        if isinstance(parsed, list):
+            parsed = parsed[0] if parsed else None
+    if not isinstance(parsed, dict):
+        fallback = True
+        parsed = None
+        for candidate in _JSON_OBJECT_RE.findall(llm_output):
+            try:
+                parsed = json.loads(candidate)
+                break
+            except json.JSONDecodeError:
+                continue
+    return (parsed if isinstance(parsed, dict) else None), fallback
+
+
+def parse_json_array(llm_output, size):
+    """
+    Toplu çıktıyı satır indeksine göre sıralı listeye çevirir.
+    Çözülemeyen ya da eksik kalan indeksler None olur.
+    """
+    return _parse_json_array(llm_output, size)[0]
+
+
+def _parse_json_array(llm_output, size):
+    # (sonuçlar, yedek_yol_kullanıldı_mı)
+    items = None
+    fallback = False
+    try:
+        items = json.loads(llm_output)
+    except json.JSONDecodeError:
+        fallback = True
+        # Açıklamayla sarılmış ya da yarıda kesilmiş çıktıdan tamamlanmış öğeler
+        items = decode_first(llm_output)
+        if not items:
+            items = []
+            for candidate in _JSON_OBJECT_RE.findall(llm_output):
+                try:
+                    items.append(json.loads(candidate))
+                except json.JSONDecodeError:
+                    continue
+    if isinstance(items, dict):
+        items = [items]
+    if not isinstance(items, list):
+        return [None] * size, fallback
+
+    results = [None] * size
+    positional = len(items) == size and not any(isinstance(i, dict) and "index" in i for i in items)
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        index = position if positional else item.pop("index", None)
+        if isinstance(index, str) and index.isdigit():
+            index = int(index)
+        if isinstance(index, int) and 0 <= index < size and results[index] is None:
+            results[index] = item
+    return results, fallback
+
+
 class LLMAgent:
-    def __init__(self):
-        self.llm = Ollama(model="llama3.2")
+    def __init__(self, metrics=None, backend=None, backend_options=None):
+        # metrics (agents.metrics.Metrics) verilirse JSON ayrıştırma süresi ve sonuçları kaydedilir.
+        self.metrics = metrics
+        # Zaman, süre, kaynak ve yol satırdan deterministik olarak okunur
+        # (agents.parser.label_fields); modelden yalnızca sınıflandırma istenir.
+        # {fields} istenen alanların örnek nesnesidir (agents.backends.field_hint).
+        self.prompt = PromptTemplate.from_template("""Log: {log_line}
+Yalnızca JSON döndür: {fields}""")
 
-        self.prompt = PromptTemplate.from_template("""
-Aşağıdaki log satırını analiz et:
+        self.batch_prompt = PromptTemplate.from_template("""{count} log satırı ([indeks] log):
+{log_lines}
+Her satır için bir nesne içeren yalnızca bir JSON dizisi döndür:
+[{fields}]""")
 
-"{log_line}"
+        # Ham model çıktısını üreten arka uç (agents.backends); varsayılan Ollama'dır
+        # ve backend_options (model, base_url, endpoints, ...) ile kurulur; birden
+        # fazla uç varsa BackendPool olur. Ayrıştırma, yeniden deneme ve bölme
+        # mantığı tüm arka uçlar için aynıdır.
+        if backend is None:
+            backend = ollama_backend(self.prompt, self.batch_prompt, **(backend_options or {}))
+        self.backend = backend
 
-Sadece **tek bir geçerli JSON nesnesi** döndür.  
-Hiçbir açıklama, yorum, ekstra bilgi, ikinci JSON BLOĞU yazma.
+    def _parse_object(self, output, fields=tuple(LABEL_FIELDS)):
+        start = time.perf_counter()
+        parsed, fallback = _parse_json_object(output)
+        parsed = _usable(parsed, fields)
+        self._record_parse(start, parsed is None, fallback)
+        return parsed
 
-Çıktı şu yapıda olmalı:
+    def _parse_array(self, output, size, fields=tuple(LABEL_FIELDS)):
+        start = time.perf_counter()
+        results, fallback = _parse_json_array(output, size)
+        results = [_usable(result, fields) for result in results]
+        self._record_parse(start, all(result is None for result in results), fallback)
+        return results
 
-{{
-  "event_type": "Login Failure, Disk Warning gibi kısa tanım",
-  "source": "örn. rest.eys.fin.gate/v2/orders",
-  "url_path": "örn. /eys/servis",
-  "duration": 123,
-  "timestamp": "2025-07-02 15:08:01",
-  "has_error": true,
-  "user_action_successful": false,
-  "is_critical": true
-}}
-""")
+    def _record_parse(self, start, failed, fallback):
+        metrics = self.metrics
+        if metrics is None:
+            return
+        metrics.observe("json_parse", time.perf_counter() - start)
+        metrics.inc("json_parse_total", outcome="failed" if failed else "fallback" if fallback else "direct")
 
-        self.chain = self.prompt | self.llm
+    def _record_retry(self, kind, lines):
+        if self.metrics is not None:
+            self.metrics.inc("llm_retries_total", kind=kind)
+            self.metrics.inc("llm_retried_lines_total", lines)
 
     def analyze(self, log_line):
-        return self.chain.invoke({"log_line": log_line})
+        return self.backend.invoke(log_line)
+
+    async def aanalyze(self, log_line):
+        return await self.backend.ainvoke(log_line)
+
+    def _incomplete(self, results):
+        # Eksik alanlara göre gruplanmış kısmi etiketler: alanlar -> satır indeksleri
+        groups = {}
+        for i, result in enumerate(results):
+            if result is not None:
+                missing = missing_fields(result)
+                if missing:
+                    groups.setdefault(tuple(missing), []).append(i)
+        return groups
+
+    def _merge_fields(self, results, indices, fields, answers):
+        # Yeniden sorulan alanları kısmi etiketlere yazar; event_type yine
+        # gelmediyse satır etiketsiz kalır (is_critical'ı filtre tamamlar).
+        for i, answer in zip(indices, answers):
+            if answer is not None:
+                results[i].update((field, answer[field]) for field in fields if field in answer)
+            if not valid_label(results[i]):
+                results[i] = None
+
+    def complete_fields(self, log_lines, results):
+        """
+        Kısmi etiketlerde eksik kalan alanları (ör. yarıda kesilen çıktıda
+        is_critical) yalnızca o alanları isteyen tek bir ek çağrıyla tamamlar.
+        """
+        for fields, indices in self._incomplete(results).items():
+            self._record_retry("fields", len(indices))
+            lines = [log_lines[i] for i in indices]
+            if len(lines) == 1:
+                answers = [self._parse_object(self.backend.invoke(lines[0], fields=fields), fields)]
+            else:
+                answers = self._parse_array(self.backend.invoke_batch(lines, fields=fields), len(lines), fields)
+            self._merge_fields(results, indices, fields, answers)
+        return results
+
+    async def acomplete_fields(self, log_lines, results):
+        """complete_fields'in asenkron karşılığı."""
+        for fields, indices in self._incomplete(results).items():
+            self._record_retry("fields", len(indices))
+            lines = [log_lines[i] for i in indices]
+            if len(lines) == 1:
+                answers = [self._parse_object(await self.backend.ainvoke(lines[0], fields=fields), fields)]
+            else:
+                output = await self.backend.ainvoke_batch(lines, fields=fields)
+                answers = self._parse_array(output, len(lines), fields)
+            self._merge_fields(results, indices, fields, answers)
+        return results
+
+    def analyze_batch(self, log_lines):
+        """
+        Birden fazla log satırını tek istemde analiz eder ve her satır için
+        çözümlenmiş JSON nesnesini (ya da None) aynı sırayla döner.
+        Çıktı tamamen bozuksa parti ikiye bölünüp yeniden denenir; yalnızca
+        bazı satırlar eksikse sadece o satırlar, bazı alanlar eksikse sadece
+        o alanlar tekrar istenir.
+        """
+        log_lines = list(log_lines)
+        if not log_lines:
+            return []
+        if len(log_lines) == 1:
+            return self.complete_fields(log_lines, [self._parse_object(self.analyze(log_lines[0]))])
+
+        output = self.backend.invoke_batch(log_lines)
+        results = self._parse_array(output, len(log_lines))
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if len(missing) == len(log_lines):
+            self._record_retry("split", len(log_lines))
+            middle = len(log_lines) // 2
+            return self.analyze_batch(log_lines[:middle]) + self.analyze_batch(log_lines[middle:])
+        self.complete_fields(log_lines, results)
+        if missing:
+            self._record_retry("partial", len(missing))
+            retried = self.analyze_batch([log_lines[i] for i in missing])
+            for i, result in zip(missing, retried):
+                results[i] = result
+        return results
+
+    async def aanalyze_batch(self, log_lines):
+        """analyze_batch'in ainvoke kullanan asenkron karşılığı."""
+        log_lines = list(log_lines)
+        if not log_lines:
+            return []
+        if len(log_lines) == 1:
+            return await self.acomplete_fields(log_lines, [self._parse_object(await self.aanalyze(log_lines[0]))])
+
+        output = await self.backend.ainvoke_batch(log_lines)
+        results = self._parse_array(output, len(log_lines))
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if len(missing) == len(log_lines):
+            self._record_retry("split", len(log_lines))
+            middle = len(log_lines) // 2
+            return await self.aanalyze_batch(log_lines[:middle]) + await self.aanalyze_batch(log_lines[middle:])
+        await self.acomplete_fields(log_lines, results)
+        if missing:
+            self._record_retry("partial", len(missing))
+            retried = await self.aanalyze_batch([log_lines[i] for i in missing])
+            for i, result in zip(missing, retried):
+                results[i] = result
+        return results
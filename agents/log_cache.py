@@ -1,24 +1,162 @@
 import json
-import difflib
+import sqlite3
+import threading
+import time
 from pathlib import Path
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS labels (
+    hash TEXT PRIMARY KEY,
+    template TEXT NOT NULL,
+    log TEXT NOT NULL,
+    norm TEXT NOT NULL,
+    parsed TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS labels_template ON labels(template);
+CREATE INDEX IF NOT EXISTS labels_accessed ON labels(accessed);
+CREATE TABLE IF NOT EXISTS signatures (
+    key BLOB NOT NULL,
+    hash TEXT NOT NULL REFERENCES labels(hash) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS signatures_key ON signatures(key);
+CREATE INDEX IF NOT EXISTS signatures_hash ON signatures(hash);
+"""
+
+
 class LogCacheManager:
-    def __init__(self, cache_path="processed_logs.jsonl", similarity_threshold=0.95):
+    """
+    LLM etiketleri için SQLite tabanlı kalıcı önbellek.
+
+    Kayıtlar normalize log hash'i ile anahtarlanır (O(1) okuma); şablon ve
+    LSH imza anahtarları ayrı indekslerde tutulur, böylece benzerlik adayları
+    tüm önbellek belleğe alınmadan sorgulanır. Her etiket üretildiği anda
+    yazılır; çalışma yarıda kesilse bile o ana kadarki etiketler kaybolmaz.
+    evict() TTL ve en az kullanılan (LRU) kayıtları atarak boyutu sınırlar.
+    """
+
+    def __init__(self, cache_path="processed_labels.db", max_entries=100000, ttl_seconds=None):
         self.cache_path = Path(cache_path)
-        self.similarity_threshold = similarity_threshold
-        self.logs = []
-        if self.cache_path.exists():
-            with open(self.cache_path, "r") as f:
-                self.logs = [line.strip() for line in f if line.strip()]
-
-    def is_similar(self, new_log):
-        for existing_log in self.logs:
-            ratio = difflib.SequenceMatcher(None, new_log, existing_log).ratio()
-            if ratio >= self.similarity_threshold:
-                return True
-        return False
-
-    def add(self, new_log):
-        self.logs.append(new_log)
-        with open(self.cache_path, "a") as f:
-            f.write(new_log.strip() + "\n")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._touched = set()
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+
+    @staticmethod
+    def _entry(row):
+        log_hash, log, norm, parsed = row
+        return log_hash, {"log": log, "parsed": json.loads(parsed), "norm": norm}
+
+    def get(self, log_hash):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT hash, log, norm, parsed FROM labels WHERE hash = ?", (log_hash,)
+            ).fetchone()
+        return self._entry(row)[1] if row else None
+
+    def by_template(self, template):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT hash, log, norm, parsed FROM labels WHERE template = ?", (template,)
+            ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def by_signature(self, keys):
+        if not keys:
+            return []
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT hash, log, norm, parsed FROM labels WHERE hash IN "
+                f"(SELECT DISTINCT hash FROM signatures WHERE key IN ({placeholders}))",
+                list(keys),
+            ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def put(self, log_hash, log, norm, parsed, template, signature_keys=()):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO labels (hash, template, log, norm, parsed, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (log_hash, template, log, norm, json.dumps(parsed, ensure_ascii=False), now, now),
+            )
+            self._conn.execute("DELETE FROM signatures WHERE hash = ?", (log_hash,))
+            self._conn.executemany(
+                "INSERT INTO signatures (key, hash) VALUES (?, ?)",
+                [(key, log_hash) for key in signature_keys],
+            )
+
+    def delete(self, log_hashes):
+        """Verilen kayıtları ve LSH anahtarlarını siler."""
+        rows = [(log_hash,) for log_hash in log_hashes]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM labels WHERE hash = ?", rows)
+            self._conn.executemany("DELETE FROM signatures WHERE hash = ?", rows)
+
+    def touch(self, log_hash):
+        """Erişim zamanını günceller; yazma flush() ile toplu yapılır."""
+        with self._lock:
+            self._touched.add(log_hash)
+
+    def flush(self):
+        with self._lock:
+            touched, self._touched = self._touched, set()
+            if touched:
+                now = time.time()
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE labels SET accessed = ? WHERE hash = ?", [(now, h) for h in touched]
+                    )
+
+    def evict(self):
+        """TTL'i dolan ve max_entries sınırını aşan en eski erişimli kayıtları siler."""
+        self.flush()
+        removed = 0
+        with self._lock, self._conn:
+            if self.ttl_seconds:
+                removed += self._conn.execute(
+                    "DELETE FROM labels WHERE created < ?", (time.time() - self.ttl_seconds,)
+                ).rowcount
+            if self.max_entries:
+                count = self._conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+                if count > self.max_entries:
+                    removed += self._conn.execute(
+                        "DELETE FROM labels WHERE hash IN "
+                        "(SELECT hash FROM labels ORDER BY accessed ASC LIMIT ?)",
+                        (count - self.max_entries,),
+                    ).rowcount
+        return removed
+
+    def items(self, page_size=1000):
+        """Tüm kayıtları (hash, entry) olarak sayfa sayfa, akış halinde döner."""
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, hash, log, norm, parsed FROM labels WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, page_size),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._entry(row[1:])
+            last_rowid = rows[-1][0]
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
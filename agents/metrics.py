@@ -0,0 +1,233 @@
+import bisect
+import json
+import os
+import threading
+import time
+
+# Saniye cinsinden gecikme kovaları (Prometheus `le` sınırları)
+LATENCY_BUCKETS = (
+    0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025,
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+CACHE_HIT_KINDS = ("exact",)
+CACHE_FUZZY_KINDS = ("template", "fuzzy")
+CACHE_CLASSIFIER_KINDS = ("classifier",)
+CACHE_COALESCED_KINDS = ("coalesced",)  # aynı şablonun süren LLM çağrısını bekleyenler
+
+
+class Histogram:
+    """Sabit kovalı gecikme histogramı; toplam, adet ve en büyük değeri de tutar."""
+
+    __slots__ = ("buckets", "counts", "sum", "count", "max")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # son kova +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Kovaların üst sınırına göre yaklaşık yüzdelik (en fazla gözlenen en büyük değer)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+def _label_text(labels):
+    return ",".join(f'{key}="{value}"' for key, value in labels)
+
+
+class Metrics:
+    """
+    Aşama gecikmeleri, sayaçlar ve göstergeler için iş parçacığı güvenli kayıt.
+
+    Her gözlem tek bir kilit altında birkaç toplama işlemidir; enabled=False
+    iken tüm çağrılar hemen döner. Sonuçlar Prometheus metin biçiminde ve JSON
+    özet olarak dışa aktarılır.
+    """
+
+    def __init__(self, enabled=True, prefix="log_analyzer"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.counters = {}    # (ad, etiketler) -> değer
+        self.gauges = {}      # ad -> değer
+        self.gauge_peaks = {}
+        self.histograms = {}  # aşama -> Histogram
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.gauges[name] = value
+            if value > self.gauge_peaks.get(name, value - 1):
+                self.gauge_peaks[name] = value
+
+    def add_gauge(self, name, delta):
+        if not self.enabled:
+            return
+        with self._lock:
+            value = self.gauges.get(name, 0) + delta
+            self.gauges[name] = value
+            if value > self.gauge_peaks.get(name, value - 1):
+                self.gauge_peaks[name] = value
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def timer(self, stage):
+        """`with metrics.timer("aşama"):` bloğunun süresini gözlemler."""
+        return _Timer(self, stage)
+
+    def counter(self, name, **labels):
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def cache_ratios(self):
+        """
+        Etiket önbelleği aramalarında tam isabet, benzer isabet, yerel
+        sınıflandırıcı, süren çağrıyı bekleme (coalesced) ve ıska (LLM'e
+        giden) oranları.
+        """
+        lookups = {}
+        for (name, labels), value in self.counters.items():
+            if name == "cache_lookups_total":
+                lookups[dict(labels)["result"]] = value
+        total = sum(lookups.values())
+        if not total:
+            return {"lookups": 0, "hit_ratio": 0.0, "fuzzy_ratio": 0.0, "classifier_ratio": 0.0,
+                    "coalesced_ratio": 0.0, "miss_ratio": 0.0}
+        hits = sum(lookups.get(kind, 0) for kind in CACHE_HIT_KINDS)
+        fuzzy = sum(lookups.get(kind, 0) for kind in CACHE_FUZZY_KINDS)
+        classified = sum(lookups.get(kind, 0) for kind in CACHE_CLASSIFIER_KINDS)
+        coalesced = sum(lookups.get(kind, 0) for kind in CACHE_COALESCED_KINDS)
+        return {
+            "lookups": total,
+            "hit_ratio": hits / total,
+            "fuzzy_ratio": fuzzy / total,
+            "classifier_ratio": classified / total,
+            "coalesced_ratio": coalesced / total,
+            "miss_ratio": (total - hits - fuzzy - classified - coalesced) / total,
+        }
+
+    def summary(self):
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": h.count,
+                    "total_seconds": round(h.sum, 6),
+                    "mean_ms": round(1000 * h.sum / h.count, 4) if h.count else 0.0,
+                    "p50_ms": round(1000 * h.quantile(0.5), 4),
+                    "p95_ms": round(1000 * h.quantile(0.95), 4),
+                    "p99_ms": round(1000 * h.quantile(0.99), 4),
+                    "max_ms": round(1000 * h.max, 4),
+                }
+                for stage, h in self.histograms.items()
+            }
+            counters = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                if labels:
+                    label = ",".join(f"{key}={text}" if len(labels) > 1 else str(text) for key, text in labels)
+                    counters.setdefault(name, {})[label] = value
+                else:
+                    counters[name] = value
+            gauges = {name: {"value": value, "peak": self.gauge_peaks.get(name, value)}
+                      for name, value in self.gauges.items()}
+        return {
+            "elapsed_seconds": round(time.time() - self.started, 3),
+            "stages": stages,
+            "counters": counters,
+            "gauges": gauges,
+            "cache": self.cache_ratios(),
+        }
+
+    def to_prometheus(self):
+        prefix = self.prefix
+        lines = []
+        with self._lock:
+            name = f"{prefix}_stage_latency_seconds"
+            lines.append(f"# HELP {name} Aşama başına gecikme (saniye).")
+            lines.append(f"# TYPE {name} histogram")
+            for stage, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum:.9g}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+
+            typed = set()
+            for (counter, labels), value in sorted(self.counters.items()):
+                full = f"{prefix}_{counter}"
+                if full not in typed:
+                    lines.append(f"# TYPE {full} counter")
+                    typed.add(full)
+                label_text = f"{{{_label_text(labels)}}}" if labels else ""
+                lines.append(f"{full}{label_text} {value}")
+
+            for gauge, value in sorted(self.gauges.items()):
+                lines.append(f"# TYPE {prefix}_{gauge} gauge")
+                lines.append(f"{prefix}_{gauge} {value}")
+                lines.append(f"# TYPE {prefix}_{gauge}_peak gauge")
+                lines.append(f"{prefix}_{gauge}_peak {self.gauge_peaks.get(gauge, value)}")
+
+        for ratio, value in self.cache_ratios().items():
+            if ratio == "lookups":
+                continue
+            lines.append(f"# TYPE {prefix}_cache_{ratio} gauge")
+            lines.append(f"{prefix}_cache_{ratio} {value:.6g}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, prom_path="results/metrics.prom", json_path="results/metrics.json"):
+        for path in (prom_path, json_path):
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        with open(prom_path, "w") as f:
+            f.write(self.to_prometheus())
+        with open(json_path, "w") as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        return False
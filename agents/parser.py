@@ -1,11 +1,225 @@
 
+import csv
 import json
+import logging
+import re
+from datetime import datetime, timezone
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2}) (\d{2}):(\d{2}):(\d{2}),(\d{3})")
+SOURCE_RE = re.compile(r"\S+ \S+ +[A-Z]+ +([^\s:]+)")
+
+FIELDS = ("timestamp", "service", "duration", "user", "error", "request_id")
+_FIELD_DEFAULTS = {
+    "timestamp": ("timestamp_field", "TIMESTAMP"),
+    "service": ("service_field", "SERVICE"),
+    "duration": ("duration_field", "DURATION"),
+    "user": ("user_field", "USER"),
+    "error": ("error_field", "ERROR"),
+    "request_id": ("requestid_field", "REQUESTID"),
+}
+
+
+def parse_timestamp(value):
+    """
+    "2025-07-02 12:34:00,000" biçimini regex gruplarıyla, diğer metinleri ISO
+    8601 olarak, sayıları epoch saniyesi (UTC) olarak yorumlar.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+    match = TIMESTAMP_RE.match(value)
+    if match:
+        year, month, day, hour, minute, second, millis = map(int, match.groups())
+        return datetime(year, month, day, hour, minute, second, millis * 1000)
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_duration(value):
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
 
 class ParserAgent:
     def parse(self, llm_output):
         try:
             return json.loads(llm_output)
         except json.JSONDecodeError as e:
-            print("JSON parse hatası:", e)
-            print("Girdi:", llm_output)
+            logger.warning("JSON parse hatası: %s Girdi: %s", e, llm_output)
             return {}
+
+
+class LogParser:
+    """
+    config.json'daki log biçimini bir kez derler; çağrı başına config okunmaz.
+
+    custom: alan adları tek bir regex'te birleştirilir ve satır bir kez taranır.
+    Satırda TIMESTAMP/SERVICE alanı yoksa satır başındaki zaman damgası ve
+    kaynak kullanılır. csv: sütun adları ("csv_columns" ya da başlık satırı)
+    sabit indeks planına çevrilir. json: orjson kuruluysa onunla çözülür.
+
+    Çıktı: timestamp (datetime), service, duration (int), user, error,
+    request_id anahtarlı sözlük; bulunamayan alanlar None'dır.
+    """
+
+    def __init__(self, config=None):
+        config = dict(config or {})
+        self.config = config
+        self.log_format = config.get("log_format", "custom")
+        self.delimiter = config.get("delimiter", ";")
+        self.names = {field: config.get(key, default) for field, (key, default) in _FIELD_DEFAULTS.items()}
+        self.columns = None
+        self._plan = None
+
+        if self.log_format == "json":
+            self.parse = self._parse_json
+        elif self.log_format == "csv":
+            self.parse = self._parse_csv
+            if config.get("csv_columns"):
+                self.set_header(config["csv_columns"])
+        else:
+            self.parse = self._parse_custom
+            delimiter = re.escape(self.delimiter)
+            self._by_name = {name: field for field, name in self.names.items()}
+            alternatives = "|".join(re.escape(name) for name in sorted(self._by_name, key=len, reverse=True))
+            self._kv_re = re.compile(
+                rf"(?<![^{delimiter}\s])({alternatives})\s*=([^{delimiter}]*)"
+            )
+
+    @property
+    def needs_header(self):
+        return self.log_format == "csv" and self._plan is None
+
+    def set_header(self, header):
+        """CSV sütun adlarını (liste ya da başlık satırı) alan -> indeks planına çevirir."""
+        if isinstance(header, str):
+            header = next(csv.reader([header], delimiter=self.delimiter))
+        self.columns = [column.strip() for column in header]
+        self.config["csv_columns"] = self.columns
+        index = {column: i for i, column in enumerate(self.columns)}
+        self._plan = [(field, index.get(name)) for field, name in self.names.items()]
+
+    def __reduce__(self):
+        # Derlenmiş desen ve bağlı metotlar yerine config taşınır; alıcı süreç
+        # ayrıştırıcıyı yeniden derler.
+        return (LogParser, (self.config,))
+
+    def __call__(self, log_line):
+        return self.parse(log_line)
+
+    def parse_many(self, log_lines):
+        """Bir satır grubunu tek seferde ayrıştırır; sonuçlar aynı sıradadır."""
+        if self.log_format == "csv":
+            return [self._from_row(row) for row in csv.reader(log_lines, delimiter=self.delimiter)]
+        parse = self.parse
+        return [parse(line) for line in log_lines]
+
+    def _finish(self, parsed):
+        timestamp = parsed["timestamp"]
+        parsed["timestamp"] = parse_timestamp(timestamp.strip() if isinstance(timestamp, str) else timestamp)
+        parsed["duration"] = parse_duration(parsed["duration"])
+        return parsed
+
+    def _parse_custom(self, log_line):
+        parsed = dict.fromkeys(FIELDS)
+        by_name = self._by_name
+        for name, value in self._kv_re.findall(log_line):
+            field = by_name[name]
+            if parsed[field] is None:
+                parsed[field] = value.strip()
+        if parsed["service"] is None:
+            match = SOURCE_RE.match(log_line)
+            if match:
+                parsed["service"] = match.group(1)
+        timestamp = parsed["timestamp"]
+        parsed["timestamp"] = parse_timestamp(log_line[:23] if timestamp is None else timestamp)
+        if parsed["duration"] is not None:
+            parsed["duration"] = parse_duration(parsed["duration"])
+        return parsed
+
+    def _parse_json(self, log_line):
+        try:
+            data = _json_loads(log_line)
+        except Exception:
+            return dict.fromkeys(FIELDS)
+        if not isinstance(data, dict):
+            return dict.fromkeys(FIELDS)
+        parsed = {field: data.get(name) for field, name in self.names.items()}
+        return self._finish(parsed)
+
+    def _parse_csv(self, log_line):
+        return self._from_row(next(csv.reader([log_line], delimiter=self.delimiter), []))
+
+    def _from_row(self, row):
+        if self._plan is None:
+            return dict.fromkeys(FIELDS)
+        size = len(row)
+        parsed = {field: (row[i] if i is not None and i < size else None) for field, i in self._plan}
+        return self._finish(parsed)
+
+
+def url_path(source):
+    """"rest.req.err.gate/v2/authentication" -> "/v2/authentication"; yol yoksa None."""
+    if not source or "/" not in source:
+        return None
+    return "/" + source.split("/", 1)[1].lstrip("/")
+
+
+def label_fields(fields):
+    """
+    LogParser çıktısından, LLM'e sorulmadan doldurulan etiket alanları:
+    timestamp, duration (ms), source, url_path ve ERROR alanı varsa
+    has_error / user_action_successful.
+    """
+    timestamp = fields["timestamp"]
+    source = fields["service"]
+    label = {
+        "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S") if timestamp is not None else None,
+        "duration": fields["duration"],
+        "source": source,
+        "url_path": url_path(source),
+    }
+    error = fields["error"]
+    if error is not None:
+        has_error = error.strip().upper() not in ("", "NONE")
+        label["has_error"] = has_error
+        label["user_action_successful"] = not has_error
+    return label
+
+
+# Modelin istemdeki örnek değeri (ya da eski şemanın açıklamasını) kopyaladığı etiketler
+_PLACEHOLDER_RE = re.compile(r"^\s*<.*>\s*$|gibi kısa tanım")
+
+
+def valid_event_type(value):
+    return isinstance(value, str) and bool(value.strip()) and not _PLACEHOLDER_RE.search(value)
+
+
+def valid_label(parsed):
+    """
+    event_type dolu ve istemdeki yer tutucunun kopyası değilse True. Yeni
+    model çıktısının yanı sıra önbellekten ve depodan okunan eski etiketlere
+    de uygulanır; geçersizler kullanılmaz, o loglar yeniden etiketlenir.
+    """
+    return isinstance(parsed, dict) and valid_event_type(parsed.get("event_type"))
+
+
+def compile_parser(config=None):
+    return LogParser(config)
@@ -5,13 +5,44 @@ from collections import Counter, defaultdict
 from datetime import datetime
 import matplotlib.pyplot as plt
 
+def _new_hour_stats():
+    return {"total": 0, "critical": 0, "errors": 0, "user_success": 0, "event_types": Counter()}
+
+
 class ReportAgent:
-    def __init__(self):
+    """
+    streaming=True iken ham kayıtlar bellekte tutulmaz; yalnızca olay türü
+    sayaçları, saatlik özetler ve kritik/hata/başarı sayıları güncellenir.
+    spill_path verilirse her kayıt bu dosyaya JSON satırı olarak eklenir.
+    Nesne pickle ile saklanıp (kontrol noktası) geri yüklenebilir; geri
+    yüklenen rapor toplamlara, taşma dosyası da sonuna eklenerek devam eder.
+    """
+
+    def __init__(self, streaming=False, spill_path=None):
+        self.streaming = streaming
+        self.spill_path = spill_path
+        self._spill = None
+        self._spill_mode = "w"
         self.total_logs = 0
         self.critical_logs = 0
         self.non_critical_logs = 0
+        self.event_counts = Counter()
+        self.hourly = defaultdict(_new_hour_stats)
+        self._hour_keys = {}
         self.events = []
-        self.all_logs = []  # ✅ Zaman bazlı özet için gerekli
+
+    def _hour_key(self, timestamp):
+        # Aynı saatin tüm kayıtları aynı öneki paylaştığından strptime her
+        # farklı önek için yalnızca bir kez çalışır.
+        prefix = timestamp[:13] if isinstance(timestamp, str) else ""
+        key = self._hour_keys.get(prefix)
+        if key is None:
+            try:
+                key = datetime.strptime(prefix, "%Y-%m-%d %H").strftime("%Y-%m-%d %H:00")
+            except Exception:
+                key = "Bilinmeyen"
+            self._hour_keys[prefix] = key
+        return key
 
     def update(self, parsed):
         self.total_logs += 1
@@ -20,8 +51,38 @@ class ReportAgent:
         else:
             self.non_critical_logs += 1
 
-        self.events.append(parsed.get("event_type", "Unknown"))
-        self.all_logs.append(parsed)  # ✅ Saat bazlı raporlamaya dahil et
+        event_type = parsed.get("event_type", "Unknown")
+        self.event_counts[event_type] += 1
+
+        stats = self.hourly[self._hour_key(parsed.get("timestamp", ""))]
+        stats["total"] += 1
+        if parsed.get("is_critical"):
+            stats["critical"] += 1
+        if parsed.get("has_error"):
+            stats["errors"] += 1
+        if parsed.get("user_action_successful"):
+            stats["user_success"] += 1
+        stats["event_types"][event_type] += 1
+
+        if self.spill_path:
+            if self._spill is None:
+                os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+                self._spill = open(self.spill_path, self._spill_mode, encoding="utf-8")
+            self._spill.write(json.dumps(parsed, ensure_ascii=False, default=str) + "\n")
+
+        if not self.streaming:
+            self.events.append(event_type)
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_spill"] = None
+        state["_spill_mode"] = "a"
+        return state
 
     def summary(self):
         print("\n📊 ANALİZ RAPORU")
@@ -29,32 +90,39 @@ class ReportAgent:
         print(f"Kritik log sayısı       : {self.critical_logs}")
         print(f"Normal log sayısı       : {self.non_critical_logs}")
         print("Olay türleri:")
-        for i, event in enumerate(self.events, start=1):
-            print(f"  {i}. {event}")
+        for i, (event, count) in enumerate(self.event_counts.most_common(), start=1):
+            print(f"  {i}. {event}: {count}")
 
     def export(self, path_json="results/report.json", path_csv="results/report.csv"):
         os.makedirs("results", exist_ok=True)
-
+        self.close()
+
+        report = {
+            "total_logs": self.total_logs,
+            "critical_logs": self.critical_logs,
+            "non_critical_logs": self.non_critical_logs,
+            "event_counts": dict(self.event_counts),
+        }
+        if not self.streaming:
+            report["events"] = self.events
         with open(path_json, "w") as f:
-            json.dump({
-                "total_logs": self.total_logs,
-                "critical_logs": self.critical_logs,
-                "non_critical_logs": self.non_critical_logs,
-                "events": self.events
-            }, f, indent=2)
+            json.dump(report, f, indent=2)
 
         with open(path_csv, "w", newline="") as f:
             writer = csv.writer(f)
-            writer.writerow(["Index", "Event Type"])
-            for i, event in enumerate(self.events, 1):
-                writer.writerow([i, event])
+            if self.streaming:
+                writer.writerow(["Event Type", "Count"])
+                writer.writerows(self.event_counts.most_common())
+            else:
+                writer.writerow(["Index", "Event Type"])
+                for i, event in enumerate(self.events, 1):
+                    writer.writerow([i, event])
 
     def plot_charts(self):
         os.makedirs("results/charts", exist_ok=True)
 
         # Bar chart for event types
-        counter = Counter(self.events)
-        labels, counts = zip(*counter.items())
+        labels, counts = zip(*self.event_counts.items())
 
         plt.figure(figsize=(10, 5))
         plt.bar(labels, counts)
@@ -82,39 +150,13 @@ class ReportAgent:
     def export_summary_table_by_interval(self, path="results/summary_by_hour.csv"):
         os.makedirs(os.path.dirname(path), exist_ok=True)
 
-        summary = defaultdict(lambda: {
-            "total": 0,
-            "critical": 0,
-            "errors": 0,
-            "user_success": 0,
-            "event_types": []
-        })
-
-        for log in self.all_logs:
-            timestamp = log.get("timestamp", "")
-            try:
-                dt = datetime.strptime(timestamp[:13], "%Y-%m-%d %H")
-                key = dt.strftime("%Y-%m-%d %H:00")
-            except Exception:
-                key = "Bilinmeyen"
-
-            stats = summary[key]
-            stats["total"] += 1
-            if log.get("is_critical"):
-                stats["critical"] += 1
-            if log.get("has_error"):
-                stats["errors"] += 1
-            if log.get("user_action_successful"):
-                stats["user_success"] += 1
-            stats["event_types"].append(log.get("event_type", "Unknown"))
-
         with open(path, "w", newline="") as f:
             writer = csv.writer(f)
             writer.writerow([
                 "Saat", "Toplam Log", "Kritik Log", "Hatalı", "Kullanıcı Başarılı", "En Sık Olay"
             ])
-            for hour, stats in sorted(summary.items()):
-                most_common_event = Counter(stats["event_types"]).most_common(1)
+            for hour, stats in sorted(self.hourly.items()):
+                most_common_event = stats["event_types"].most_common(1)
                 most_common_event_str = most_common_event[0][0] if most_common_event else "N/A"
                 writer.writerow([
                     hour,
@@ -0,0 +1,125 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+import numpy as np
+
+_EPOCH = datetime(1970, 1, 1)
+_METRICS = ("count", "errors", "duration_sum", "duration_sq", "duration_count")
+
+
+def minute_index(ts):
+    return (ts - _EPOCH) // timedelta(minutes=1)
+
+
+def minute_datetime(index):
+    return _EPOCH + timedelta(minutes=int(index))
+
+
+class RollupCube:
+    """
+    Dakika x (servis, kullanıcı) boyutlarında önceden toplanmış metrikler.
+
+    Her hücre log sayısı, hata sayısı ve DURATION toplam/kare toplam/adet
+    değerlerini tutar; hata mesajları ayrıca sayılır. Seyrek (COO) biçimde npz
+    olarak saklanır; pencere/eşik değişiklikleri LLM'e dönmeden bu küp
+    üzerinden milisaniyeler içinde yeniden değerlendirilir.
+    """
+
+    def __init__(self):
+        self.cells = {}            # (dakika, anahtar indeksi) -> [metrikler]
+        self.keys = []             # [(servis, kullanıcı)]
+        self._key_index = {}
+        self.messages = Counter()
+
+    def _key(self, service, user):
+        key = (service or "", user or "")
+        index = self._key_index.get(key)
+        if index is None:
+            index = self._key_index[key] = len(self.keys)
+            self.keys.append(key)
+        return index
+
+    def add(self, ts, service=None, user=None, is_error=False, duration=None, message=None):
+        # Zaman damgası olmayan satırların yalnızca hata mesajı sayılır.
+        if message:
+            self.messages[message] += 1
+        if ts is None:
+            return
+        cell_key = (minute_index(ts), self._key(service, user))
+        cell = self.cells.get(cell_key)
+        if cell is None:
+            cell = self.cells[cell_key] = [0, 0, 0, 0, 0]
+        cell[0] += 1
+        if is_error:
+            cell[1] += 1
+        if duration is not None:
+            cell[2] += duration
+            cell[3] += duration * duration
+            cell[4] += 1
+
+    def merge(self, other):
+        for (minute, key_index), values in other.cells.items():
+            cell_key = (minute, self._key(*other.keys[key_index]))
+            cell = self.cells.get(cell_key)
+            if cell is None:
+                self.cells[cell_key] = list(values)
+            else:
+                for i, value in enumerate(values):
+                    cell[i] += value
+        self.messages.update(other.messages)
+        return self
+
+    def arrays(self):
+        """Hücreleri (dakika, anahtar, metrik...) sütun dizileri olarak döner."""
+        items = sorted(self.cells.items())
+        columns = {
+            "minute": np.array([k[0] for k, _ in items], dtype=np.int64),
+            "key": np.array([k[1] for k, _ in items], dtype=np.int32),
+        }
+        for i, name in enumerate(_METRICS):
+            dtype = np.float64 if name.startswith("duration_s") else np.int64
+            columns[name] = np.array([v[i] for _, v in items], dtype=dtype)
+        return columns
+
+    def save(self, path="results/rollup.npz"):
+        columns = self.arrays()
+        np.savez_compressed(
+            path,
+            services=np.array([k[0] for k in self.keys], dtype=str),
+            users=np.array([k[1] for k in self.keys], dtype=str),
+            message_text=np.array(list(self.messages), dtype=str),
+            message_count=np.array(list(self.messages.values()), dtype=np.int64),
+            **columns,
+        )
+        return path
+
+    @classmethod
+    def load(cls, path="results/rollup.npz"):
+        cube = cls()
+        with np.load(path, allow_pickle=False) as data:
+            for service, user in zip(data["services"].tolist(), data["users"].tolist()):
+                cube._key(service, user)
+            metrics = [data[name].tolist() for name in _METRICS]
+            for row, cell_key in enumerate(zip(data["minute"].tolist(), data["key"].tolist())):
+                cube.cells[cell_key] = [column[row] for column in metrics]
+            cube.messages = Counter(dict(zip(data["message_text"].tolist(), data["message_count"].tolist())))
+        return cube
+
+    def minute_series(self, metric="count", by=None):
+        """
+        Dakikalık seri: (dakikalar, değerler). by=None tüm anahtarları toplar;
+        by="service" ya da "user" ise (anahtarlar, dakikalar, matris) döner.
+        Yalnızca en az bir log içeren dakikalar eksende yer alır.
+        """
+        columns = self.arrays()
+        minutes, position = np.unique(columns["minute"], return_inverse=True)
+        values = columns[metric]
+        if by is None:
+            return minutes, np.bincount(position, weights=values, minlength=len(minutes)).astype(values.dtype)
+        field = 0 if by == "service" else 1
+        labels = sorted({key[field] for key in self.keys})
+        label_index = {label: i for i, label in enumerate(labels)}
+        rows = np.array([label_index[self.keys[k][field]] for k in columns["key"].tolist()], dtype=np.int64)
+        matrix = np.zeros((len(labels), len(minutes)), dtype=values.dtype)
+        np.add.at(matrix, (rows, position), values)
+        return labels, minutes, matrix
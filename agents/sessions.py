@@ -0,0 +1,161 @@
+from datetime import timedelta
+
+from agents.sketches import DDSketch
+
+
+def _ms(delta):
+    return delta.total_seconds() * 1000
+
+
+class RequestSessionizer:
+    """
+    REQUESTID başına yalnızca [ilk, son, adet] tutan akış oturumlayıcısı.
+
+    Açık oturumlar son dokunuş sırasıyla tutulur; gelen bir kaydın zamanı bir
+    oturumun son kaydından `gap`'ten fazla ilerideyse oturum kapanır ve süresi
+    (birden fazla kaydı varsa) toplam/min/max ve DDSketch'e eklenir. Bellek
+    yalnızca açık oturum sayısıyla sınırlıdır.
+
+    Parçalı işlemede bir parçanın ilk `gap` süresi içinde başlayan oturumlar
+    (baş oturumlar) önceki parçanın açık kalan oturumlarının devamı
+    olabileceğinden kapansalar bile özete eklenmeden ayrı tutulur; merge bu
+    baş/kuyruk oturumlarını eşleştirir. Zaman damgaları dosya sırasıyla
+    artıyorsa sonuç seri işlemle aynıdır.
+    """
+
+    def __init__(self, gap=timedelta(minutes=30)):
+        self.gap = gap
+        self.open = {}   # reqid -> [ilk, son, adet], son dokunuş sırasıyla
+        self.head = {}   # kapanmış baş oturumlar
+        self.first_time = None
+        self.last_time = None
+
+        self.span_count = 0
+        self.span_sum = timedelta(0)
+        self.span_min = None
+        self.span_max = None
+        self.span_sketch = DDSketch()
+
+    def __len__(self):
+        return len(self.open)
+
+    def update(self, reqid, ts):
+        if self.first_time is None:
+            self.first_time = ts
+        if self.last_time is None or ts > self.last_time:
+            self.last_time = ts
+        self._evict(ts)
+        span = self.open.pop(reqid, None)
+        if span is None:
+            span = [ts, ts, 1]
+        else:
+            if ts < span[0]:
+                span[0] = ts
+            if ts > span[1]:
+                span[1] = ts
+            span[2] += 1
+        self.open[reqid] = span
+
+    def _evict(self, now):
+        open_spans = self.open
+        limit = now - self.gap
+        while open_spans:
+            reqid = next(iter(open_spans))
+            span = open_spans[reqid]
+            if span[1] >= limit:
+                break
+            del open_spans[reqid]
+            self._close(reqid, span)
+
+    def _close(self, reqid, span):
+        if span[0] - self.first_time <= self.gap:
+            self.head[reqid] = span
+        else:
+            self._record(span)
+
+    def _record(self, span):
+        if span[2] < 2:
+            return
+        duration = span[1] - span[0]
+        self.span_count += 1
+        self.span_sum += duration
+        if self.span_min is None or duration < self.span_min:
+            self.span_min = duration
+        if self.span_max is None or duration > self.span_max:
+            self.span_max = duration
+        self.span_sketch.add(_ms(duration))
+
+    def merge(self, other):
+        """Dosyada hemen sonra gelen satırları işlemiş bir oturumlayıcıyı ekler."""
+        if other.first_time is None:
+            return self
+        if self.first_time is None:
+            self.__dict__.update(other.__dict__)
+            return self
+
+        gap = self.gap
+        tail = self.open
+        # other'ın baş oturumları, bu tarafta açık kalan oturumların devamı olabilir.
+        for reqid, span in list(other.head.items()):
+            previous = tail.get(reqid)
+            if previous is not None and span[0] - previous[1] <= gap:
+                del tail[reqid]
+                self._close(reqid, [previous[0], span[1], previous[2] + span[2]])
+            else:
+                self._close(reqid, span)
+        continued = {}
+        for reqid, span in other.open.items():
+            previous = tail.get(reqid)
+            if previous is not None and span[0] - other.first_time <= gap and span[0] - previous[1] <= gap:
+                del tail[reqid]
+                continued[reqid] = [previous[0], span[1], previous[2] + span[2]]
+        # Devam etmeyen kuyruk oturumları, diğer parçanın son kaydına göre kapanır.
+        for reqid, span in list(tail.items()):
+            if other.last_time - span[1] > gap:
+                del tail[reqid]
+                self._close(reqid, span)
+        for reqid, span in other.open.items():
+            if reqid in tail:
+                # Yalnızca sıralı olmayan zaman damgalarında görülür.
+                self._close(reqid, tail.pop(reqid))
+            tail[reqid] = continued.get(reqid, span)
+
+        self.last_time = max(self.last_time, other.last_time)
+        if other.span_count:
+            self.span_count += other.span_count
+            self.span_sum += other.span_sum
+            if self.span_min is None or other.span_min < self.span_min:
+                self.span_min = other.span_min
+            if self.span_max is None or other.span_max > self.span_max:
+                self.span_max = other.span_max
+            self.span_sketch.merge(other.span_sketch)
+        return self
+
+    def finished(self):
+        """Açık ve baş oturumlar da kapatılmış sayılarak oluşan özet (durum değişmez)."""
+        total = RequestSessionizer(self.gap)
+        total.first_time = self.first_time
+        total.span_count = self.span_count
+        total.span_sum = self.span_sum
+        total.span_min = self.span_min
+        total.span_max = self.span_max
+        total.span_sketch.merge(self.span_sketch)
+        for span in self.head.values():
+            total._record(span)
+        for span in self.open.values():
+            total._record(span)
+        return total
+
+    def summary(self):
+        """Birden fazla kaydı olan oturumların ms cinsinden süre özeti."""
+        total = self.finished()
+        if not total.span_count:
+            return {"count": 0}
+        result = total.span_sketch.summary()
+        result.update({
+            "count": total.span_count,
+            "avg": _ms(total.span_sum) / total.span_count,
+            "min": _ms(total.span_min),
+            "max": _ms(total.span_max),
+        })
+        return result
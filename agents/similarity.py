@@ -0,0 +1,146 @@
+import re
+import zlib
+import hashlib
+from collections import defaultdict
+
+import numpy as np
+from rapidfuzz import fuzz
+
+_TIMESTAMP_RE = re.compile(r"\d{4}-\d{2}-\d{2}[\s,:.\d]+")
+_REQUESTID_RE = re.compile(r"REQUESTID=[^;]+;")
+# Şablon çıkarımı: sayılar, hex/uuid benzeri kimlikler ve boşluk dizileri maskelenir
+_ID_RE = re.compile(r"\b[0-9a-fA-F]{8,}\b|\d+")
+_SPACE_RE = re.compile(r"\s+")
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_SHINGLE_SIZE = 4
+
+
+def normalize_log(log):
+    log = _TIMESTAMP_RE.sub("", log)
+    log = _REQUESTID_RE.sub("", log)
+    return log.strip()
+
+
+def compact_log(log):
+    """LLM girdisi: zaman damgası ve REQUESTID çıkarılmış, boşlukları sıkıştırılmış satır."""
+    return _SPACE_RE.sub(" ", normalize_log(log))
+
+
+def get_log_hash(log, norm=None):
+    if norm is None:
+        norm = normalize_log(log)
+    return hashlib.blake2b(norm.encode(), digest_size=16).hexdigest()
+
+
+def log_template(norm):
+    """Normalize edilmiş logun kimlik ve sayılardan arındırılmış şablonu."""
+    return _SPACE_RE.sub(" ", _ID_RE.sub("<*>", norm))
+
+
+class SimilarityIndex:
+    """
+    İşlenmiş loglar için benzerlik indeksi.
+
+    Arama sırası: birebir hash -> aynı şablon kovası -> MinHash/LSH aday kovaları.
+    Adaylar yine fuzz.ratio >= threshold ile doğrulanır; normalize edilmiş
+    metinler eklenirken bir kez hesaplanır, karşılaştırmada tekrar üretilmez.
+    """
+
+    def __init__(self, threshold=90, num_perm=32, bands=16, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm, bands değerine tam bölünmelidir")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        # a, b < 2^31 ve crc32 < 2^32 olduğundan a*x + b uint64 sınırını aşmaz
+        self._a = rng.integers(1, 1 << 31, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=(num_perm, 1), dtype=np.uint64)
+
+        self.entries = {}          # hash -> {"log": ..., "parsed": ...}
+        self._norms = {}           # hash -> normalize edilmiş log
+        self._templates = defaultdict(list)   # şablon -> [hash]
+        self._lsh = defaultdict(list)         # bant anahtarı -> [hash]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load(self, processed_logs):
+        for log_hash, entry in processed_logs.items():
+            self.add(entry["log"], entry["parsed"], log_hash=log_hash)
+
+    def _minhash(self, norm):
+        if len(norm) <= _SHINGLE_SIZE:
+            shingles = {norm}
+        else:
+            shingles = {norm[i:i + _SHINGLE_SIZE] for i in range(len(norm) - _SHINGLE_SIZE + 1)}
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+        return ((self._a * hashes + self._b) % _MERSENNE_PRIME).min(axis=1)
+
+    def signature_keys(self, norm):
+        """MinHash imzasının LSH bant anahtarları (kalıcı saklamaya uygun bytes)."""
+        signature = self._minhash(norm)
+        rows = self.rows
+        return [bytes((band,)) + signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+
+    def score(self, norm, other_norm):
+        return fuzz.ratio(norm, other_norm, score_cutoff=self.threshold)
+
+    def add(self, log, parsed, log_hash=None, norm=None, keys=None):
+        if norm is None:
+            norm = normalize_log(log)
+        if log_hash is None:
+            log_hash = get_log_hash(log, norm=norm)
+        if log_hash in self.entries:
+            self.entries[log_hash] = {"log": log, "parsed": parsed}
+            return log_hash
+        self.entries[log_hash] = {"log": log, "parsed": parsed}
+        self._norms[log_hash] = norm
+        self._templates[log_template(norm)].append(log_hash)
+        for key in keys if keys is not None else self.signature_keys(norm):
+            self._lsh[key].append(log_hash)
+        return log_hash
+
+    def _best(self, norm, candidates, seen):
+        best_hash, best_score = None, self.threshold
+        for candidate in candidates:
+            if candidate in seen:
+                continue
+            seen.add(candidate)
+            score = fuzz.ratio(norm, self._norms[candidate], score_cutoff=best_score)
+            if score >= best_score:
+                best_hash, best_score = candidate, score
+        return best_hash
+
+    def find(self, norm, log_hash, keys=None):
+        """Eşleşen kaydın hash'ini ve türünü döner: (hash, "exact"|"template"|"fuzzy") ya da (None, None)."""
+        if log_hash in self.entries:
+            return log_hash, "exact"
+
+        seen = set()
+        match = self._best(norm, self._templates.get(log_template(norm), ()), seen)
+        if match is not None:
+            return match, "template"
+
+        candidates = []
+        for key in keys if keys is not None else self.signature_keys(norm):
+            candidates.extend(self._lsh.get(key, ()))
+        match = self._best(norm, candidates, seen)
+        if match is not None:
+            return match, "fuzzy"
+        return None, None
+
+    def lookup(self, log, log_hash=None, norm=None, keys=None):
+        """
+        Benzer kayıt arar. (entry, tür) döner; tür "exact", "template",
+        "fuzzy" ya da bulunamazsa None'dur.
+        """
+        if norm is None:
+            norm = normalize_log(log)
+        if log_hash is None:
+            log_hash = get_log_hash(log, norm=norm)
+        match, kind = self.find(norm, log_hash, keys=keys)
+        if match is None:
+            return None, None
+        return self.entries[match], kind
@@ -0,0 +1,110 @@
+import math
+from collections import Counter
+from hashlib import blake2b
+
+
+class DDSketch:
+    """
+    Göreli hata garantili quantile sketch'i (DDSketch).
+
+    Pozitif değerler gamma = (1 + a) / (1 - a) tabanlı logaritmik kovalarda
+    sayılır; döndürülen her quantile gerçek değere en fazla `relative_accuracy`
+    göreli uzaklıktadır. Bellek kova sayısıyla (değer aralığının logaritması)
+    sınırlıdır ve sketch'ler kova sayaçları toplanarak birleştirilir.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = Counter()
+        self.zero_count = 0  # sıfır ve negatif değerler
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        if value > 0:
+            self.bins[math.ceil(math.log(value) / self._log_gamma)] += 1
+        else:
+            self.zero_count += 1
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Farklı doğruluktaki DDSketch'ler birleştirilemez.")
+        if not other.count:
+            return self
+        self.bins.update(other.bins)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if self.min is None or other.min < self.min:
+            self.min = other.min
+        if self.max is None or other.max > self.max:
+            self.max = other.max
+        return self
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return self.min if self.min <= 0 else 0
+        seen = self.zero_count
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self, quantiles=(0.5, 0.95, 0.99)):
+        result = {"count": self.count, "min": self.min, "max": self.max}
+        for q in quantiles:
+            value = self.quantile(q)
+            result[f"p{round(q * 100)}"] = round(value, 2) if value is not None else None
+        return result
+
+
+class HyperLogLog:
+    """
+    Farklı değer sayısı tahmini (HyperLogLog, 2^precision yazmaç).
+
+    Değerler blake2b ile özetlendiği için süreçten bağımsızdır; farklı
+    süreçlerde ya da zaman dilimlerinde doldurulan sketch'ler yazmaçların
+    maksimumu alınarak birleştirilir. precision=14 için standart hata ~%0.8.
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+        self._shift = 64 - precision
+        self._mask = (1 << self._shift) - 1
+
+    def add(self, value):
+        digest = blake2b(value.encode("utf-8", "replace"), digest_size=8).digest()
+        x = int.from_bytes(digest, "big")
+        index = x >> self._shift
+        rank = self._shift - (x & self._mask).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Farklı hassasiyetteki HyperLogLog'lar birleştirilemez.")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # küçük kümeler için doğrusal sayım
+        return round(estimate)
@@ -3,8 +3,9 @@ import pandas as pd
 import json
 import os
 from PIL import Image
-import tempfile
-import subprocess
+import threading
+import time
+import traceback
 import unicodedata
 
 st.set_page_config(page_title="Log Analiz Paneli", layout="wide")
@@ -24,29 +25,73 @@ if uploaded_config:
         f.write(config_content)
     st.sidebar.success("Config dosyası yüklendi ve kaydedildi!")
 
+@st.cache_resource
+def get_analyzer():
+    # Model istemcisi ve etiket deposu bir kez kurulur, tüm analizlerde sıcak kalır.
+    from main import LogAnalyzer, load_config, setup_logging
+    config = load_config()
+    setup_logging(config)
+    return LogAnalyzer(config)
+
+
+@st.cache_resource
+def get_job():
+    # Arka plan analiz işinin durumu; sayfa yeniden çalıştırmaları arasında paylaşılır.
+    return {"thread": None, "progress": 0.0, "message": "", "error": None, "finished": False}
+
+
+def start_analysis(log_path):
+    job = get_job()
+    if job["thread"] is not None and job["thread"].is_alive():
+        return
+    job.update(progress=0.0, message="Analiz başlatılıyor...", error=None, finished=False)
+
+    def on_progress(fraction, message):
+        job["progress"] = fraction
+        job["message"] = message
+
+    def run():
+        try:
+            from main import load_config
+            get_analyzer().analyze(log_path, config=load_config(), progress=on_progress)
+        except Exception:
+            job["error"] = traceback.format_exc()
+        finally:
+            job["finished"] = True
+
+    job["thread"] = threading.Thread(target=run, daemon=True)
+    job["thread"].start()
+
+
 if uploaded_file:
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".txt", dir="logs", mode="w") as tmp:
-        content = uploaded_file.read().decode("utf-8")
-        tmp.write(content)
-        tmp_path = tmp.name
-
-
-    logs_dir = "logs"
-    os.makedirs(logs_dir, exist_ok=True)
-    saved_path = os.path.join(logs_dir, "logs.txt")
-    with open(saved_path, "w") as f:
-        f.write(content)
-
-    with st.spinner("LLM ile analiz ediliyor..."):
-        result = subprocess.run(["python", "main.py"], capture_output=True, text=True)
-        if result.returncode != 0:
-            st.error("main.py çalıştırılırken hata oluştu:")
-            st.text(result.stderr)
-            st.stop()
-        else:
-            st.success("Log analizi tamamlandı!")
+    content = uploaded_file.getvalue().decode("utf-8")
+
+    # Aynı dosya için her etkileşimde analiz yeniden başlatılmaz.
+    upload_key = (uploaded_file.name, uploaded_file.size)
+    if st.session_state.get("analyzed_upload") != upload_key:
+        logs_dir = "logs"
+        os.makedirs(logs_dir, exist_ok=True)
+        saved_path = os.path.join(logs_dir, "logs.txt")
+        with open(saved_path, "w") as f:
+            f.write(content)
+        st.session_state["analyzed_upload"] = upload_key
+        st.session_state["analysis_path"] = saved_path
+        start_analysis(saved_path)
+
+job = get_job()
+if job["thread"] is not None and job["thread"].is_alive():
+    st.progress(job["progress"], text=f"LLM ile analiz ediliyor... {job['message']}")
+    time.sleep(1)
+    st.rerun()
+elif job["finished"]:
+    if job["error"]:
+        st.error("Analiz sırasında hata oluştu:")
+        st.text(job["error"])
+        st.stop()
+    st.success("Log analizi tamamlandı!")
 
 report_path = "results/report.json"
+rollup_path = "results/rollup.npz"
 if not os.path.exists(report_path):
     st.warning("Henüz bir analiz raporu bulunamadı. Lütfen log yükleyin.")
     st.stop()
@@ -93,6 +138,20 @@ col1.metric("Toplam Log", report["total_logs"])
 col2.metric("Kritik Log", report["critical_logs"])
 col3.metric("Normal Log", report["non_critical_logs"])
 
+# --- DURATION Yüzdelikleri ve Farklı Değer Sayıları ---
+if report.get("sketches"):
+    sketches = report["sketches"]
+    duration = sketches.get("duration", {})
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("DURATION p50 (ms)", duration.get("p50"))
+    col2.metric("DURATION p95 (ms)", duration.get("p95"))
+    col3.metric("DURATION p99 (ms)", duration.get("p99"))
+    col4.metric("Farklı Kullanıcı (≈)", sketches.get("distinct_users"))
+    col5.metric("Farklı REQUESTID (≈)", sketches.get("distinct_request_ids"))
+    if sketches.get("duration_by_endpoint"):
+        with st.expander("Servis bazında DURATION yüzdelikleri"):
+            st.dataframe(pd.DataFrame.from_dict(sketches["duration_by_endpoint"], orient="index"), use_container_width=True)
+
 # --- Analiz Raporunu İndir ---
 st.download_button(
     label="Analiz Sonucunu İndir (JSON)",
@@ -103,7 +162,12 @@ st.download_button(
 
 # --- Olay Türleri ---
 st.header("Olay Türleri")
-event_df = pd.DataFrame({"#": range(1, len(report["events"])+1), "Olay Türü": report["events"]})
+if "events" in report:
+    event_df = pd.DataFrame({"#": range(1, len(report["events"])+1), "Olay Türü": report["events"]})
+else:
+    # Akış modunda yalnızca olay türü sayıları raporlanır
+    event_counts = sorted(report.get("event_counts", {}).items(), key=lambda item: -item[1])
+    event_df = pd.DataFrame(event_counts, columns=["Olay Türü", "Adet"])
 st.dataframe(event_df, use_container_width=True)
 
 # --- Grafiksel Dağılım ---
@@ -167,16 +231,23 @@ threshold = st.sidebar.slider("Eşik (σ)", min_value=0.5, max_value=5.0, value=
 with open("anomaly_config.json", "w") as f:
     json.dump({"window": window_size, "threshold": threshold}, f)
 
+# --- Anomalilerin Dakikalık Küpten Yeniden Hesaplanması ---
+# Pencere/eşik değişiklikleri LLM analizini yeniden başlatmaz; kaydedilen
+# results/rollup.npz küpü yeni parametrelerle anında değerlendirilir.
+@st.cache_data
+def load_rollup(path, mtime):
+    from agents.rollup import RollupCube
+    return RollupCube.load(path)
+
+if os.path.exists(rollup_path):
+    from agents.anomaly import AnomalyAgent, anomaly_report
+    rollup = load_rollup(rollup_path, os.path.getmtime(rollup_path))
+    evaluated = AnomalyAgent().evaluate_rollup(rollup, window=window_size, threshold=threshold)
+    report.update(anomaly_report(**evaluated, threshold=threshold))
+
 # --- Analizi Yeniden Başlat Butonu ---
-if st.sidebar.button("Analizi Yeniden Başlat (Anomali Ayarları ile)"):
-    with st.spinner("LLM ile analiz tekrar başlatılıyor..."):
-        result = subprocess.run(["python", "main.py"], capture_output=True, text=True)
-        if result.returncode != 0:
-            st.error("main.py çalıştırılırken hata oluştu:")
-            st.text(result.stderr)
-            st.stop()
-        else:
-            st.success("Log analizi tekrarlandı! Sonuçlar güncellendi.")
+if st.sidebar.button("Analizi Yeniden Başlat"):
+    start_analysis(st.session_state.get("analysis_path", "logs/server.txt"))
     st.rerun()
 
 # --- Seçili Anomali Parametreleri Kutusu ---
@@ -216,6 +287,21 @@ if (
 else:
     st.info("Anomali tespit edilmedi.")
 
+metrics_path = "results/metrics.json"
+if os.path.exists(metrics_path):
+    with open(metrics_path, "r") as f:
+        metrics = json.load(f)
+    with st.expander("Aşama Metrikleri", expanded=False):
+        cache = metrics.get("cache", {})
+        col1, col2, col3, col4, col5 = st.columns(5)
+        col1.metric("Önbellek İsabeti", f"%{100 * cache.get('hit_ratio', 0):.1f}")
+        col2.metric("Benzer İsabet", f"%{100 * cache.get('fuzzy_ratio', 0):.1f}")
+        col3.metric("Yerel Sınıflandırıcı", f"%{100 * cache.get('classifier_ratio', 0):.1f}")
+        col4.metric("Süren Çağrıyı Bekleyen", f"%{100 * cache.get('coalesced_ratio', 0):.1f}")
+        col5.metric("LLM'e Giden", f"%{100 * cache.get('miss_ratio', 0):.1f}")
+        if metrics.get("stages"):
+            st.dataframe(pd.DataFrame.from_dict(metrics["stages"], orient="index"), use_container_width=True)
+
 
 # Analiz edilen log dosyasını göster
 st.sidebar.markdown("---")
@@ -0,0 +1,7 @@
+"""
+Sentetik log üreteci ve aşama bazlı performans ölçümü.
+
+    python -m benchmarks.generate logs/bench.txt --lines 100000
+    python -m benchmarks.run                    # benchmarks/baseline.json ile karşılaştırır
+    python -m benchmarks.run --lines 100000 --no-compare
+"""
@@ -0,0 +1,100 @@
+import argparse
+import base64
+import random
+from datetime import datetime, timedelta
+
+# logs/anomal.txt ve processed_labels.json'daki gerçek kayıtlardan alınan kaynaklar ve mesajlar
+ERROR_SOURCES = [
+    "rest.req.err.gate/v2/authentication",
+    "rest.req.err.gate/v1/reports/ewr-position",
+    "rest.req.err.gate/v1/reports/overall",
+    "rest.req.err.gate/v1/accounts/balance",
+]
+INFO_SOURCES = [
+    "rest.req.info.gate/v2/authentication",
+    "rest.req.info.gate/v1/reports/ewr-position",
+    "rest.req.info.gate/v1/accounts/balance",
+]
+ERROR_MESSAGES = [
+    "Kullanıcı bilgileri eksik veya hatalıdır!",
+    "60676:Bu hesap numarası ile tanımlı hesap bulunamadı!|ro_ewrReportPosition",
+    "60676:Bu hesap numarası ile tanımlı hesap bulunamadı!|rg_ovrReportAccountOverall",
+    "accountId should be of type java.lang.Integer; DESCRIPTION=Failed to convert value of type 'java.lang.String' to required type 'java.lang.Integer'; For input string: \"{n}\"",
+    "Connection timeout while calling account service after {n} ms",
+    "Database timeout on query {n}",
+    "Unauthorized access attempt for account {n}",
+    "Out of memory in report worker {n}",
+]
+SOURCE_WIDTH = 59  # gerçek loglardaki hizalama
+
+
+def request_id(rng):
+    return base64.urlsafe_b64encode(rng.getrandbits(128).to_bytes(16, "big")).decode()[:22]
+
+
+def format_line(ts, level, source, fields):
+    body = " ".join(f"{key}={value};" for key, value in fields)
+    return f"{ts:%Y-%m-%d %H:%M:%S},{ts.microsecond // 1000:03d} {level} {source:<{SOURCE_WIDTH}} : {body}"
+
+
+def iter_logs(lines, error_ratio=0.6, seed=42, start=None, users=50, mean_gap_ms=150,
+              request_reuse=0.3, bursts=1, burst_size=300):
+    """
+    `YYYY-MM-DD HH:MM:SS,mmm LEVEL kaynak : REQUESTID=..; ERROR=..;` biçiminde
+    deterministik satırlar üretir. Bazı REQUESTID'ler birkaç satırda tekrar
+    eder; `bursts` adet dakikaya anomali tespiti için yoğun hata eklenir.
+    """
+    rng = random.Random(seed)
+    ts = start or datetime(2025, 7, 2, 0, 0, 0)
+    burst_at = set(rng.sample(range(lines), min(bursts, lines))) if bursts else set()
+    open_requests = []
+    produced = 0
+    while produced < lines:
+        if produced in burst_at:
+            source = rng.choice(ERROR_SOURCES)
+            message = rng.choice(ERROR_MESSAGES).format(n=rng.randint(1, 99999))
+            for _ in range(min(burst_size, lines - produced)):
+                ts += timedelta(milliseconds=rng.randint(0, 2))
+                yield format_line(ts, "ERROR", source, [("REQUESTID", request_id(rng)), ("ERROR", message)])
+                produced += 1
+            continue
+
+        ts += timedelta(milliseconds=int(rng.expovariate(1 / mean_gap_ms)))
+        if open_requests and rng.random() < request_reuse:
+            reqid = open_requests.pop(rng.randrange(len(open_requests)))
+        else:
+            reqid = request_id(rng)
+            if len(open_requests) < 1000:
+                open_requests.append(reqid)
+        fields = [("REQUESTID", reqid), ("USER", f"u{rng.randint(1, users)}"),
+                  ("DURATION", int(rng.lognormvariate(5, 1.2)))]
+        if rng.random() < error_ratio:
+            fields.append(("ERROR", rng.choice(ERROR_MESSAGES).format(n=rng.randint(1, 99999))))
+            yield format_line(ts, "ERROR", rng.choice(ERROR_SOURCES), fields)
+        else:
+            fields.append(("ERR", "NONE"))
+            yield format_line(ts, "INFO", rng.choice(INFO_SOURCES), fields)
+        produced += 1
+
+
+def generate_logs(path, lines, **kwargs):
+    with open(path, "w", encoding="utf-8") as f:
+        for line in iter_logs(lines, **kwargs):
+            f.write(line + "\n")
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sentetik log dosyası üretir.")
+    parser.add_argument("path")
+    parser.add_argument("--lines", type=int, default=100000)
+    parser.add_argument("--error-ratio", type=float, default=0.6)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--bursts", type=int, default=1)
+    args = parser.parse_args(argv)
+    generate_logs(args.path, args.lines, error_ratio=args.error_ratio, seed=args.seed, bursts=args.bursts)
+    print(f"{args.lines} satır '{args.path}' dosyasına yazıldı.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from agents.analytics import AnalyticsEngine, is_error_log
+from agents.anomaly import AnomalyAgent
+from agents.collector import CollectorAgent
+from agents.filter import FilterAgent
+from agents.label_cache import LabelCache
+from agents.parser import compile_parser
+from agents.report import ReportAgent
+from agents.similarity import normalize_log, get_log_hash
+from benchmarks.generate import generate_logs
+from benchmarks.stubs import StubLLMAgent, stub_label
+
+STAGES = ["collect", "parse", "normalize_lookup", "filter", "analytics", "anomaly", "report", "pipeline"]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SEED_LABELS = 200  # önbelleğe önceden etiketlenmiş olarak eklenen hata satırı sayısı
+
+
+def best_of(fn, repeat):
+    """fn'i repeat kez çalıştırır; en kısa süreyi ve son sonucu döner."""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def stage_result(seconds, lines, **extra):
+    result = {
+        "seconds": round(seconds, 6),
+        "lines": lines,
+        "lines_per_sec": round(lines / seconds, 1) if seconds else None,
+        "us_per_line": round(seconds * 1e6 / lines, 3) if lines else None,
+    }
+    result.update(extra)
+    return result
+
+
+def make_llm_agent(backend, llm_latency_ms, error_rate=0.0, malformed_rate=0.0, seed=42, pool_latencies=None):
+    """
+    "stub": ayrıştırmayı atlayan sahte ajan; "synthetic": gerçek LLMAgent
+    (JSON ayrıştırma ve yeniden denemeler dahil) + SyntheticBackend; "pool":
+    gerçek LLMAgent + her gecikme değeri için bir yerel StubOllamaServer'a
+    HTTP ile giden BackendPool (sunucular süreç sonuna kadar arka planda çalışır).
+    (ajan, çağrı sayısını veren fonksiyon) döner.
+    """
+    if backend == "stub":
+        llm = StubLLMAgent(latency_ms=llm_latency_ms)
+        return llm, lambda: llm.calls
+    from agents.llm_agent import LLMAgent
+    if backend == "pool":
+        from benchmarks.stub_server import StubOllamaServer
+        servers = [StubOllamaServer(latency_ms=latency).start() for latency in pool_latencies or [llm_latency_ms]]
+        options = {"endpoints": [{"url": server.url, "max_concurrency": 4} for server in servers]}
+        return LLMAgent(backend_options=options), lambda: sum(server.requests for server in servers)
+    from agents.backends import SyntheticBackend
+    synthetic = SyntheticBackend(latency_ms=llm_latency_ms, per_line_ms=0.0, distribution="lognormal",
+                                 error_rate=error_rate, malformed_rate=malformed_rate, seed=seed)
+    return LLMAgent(backend=synthetic), lambda: synthetic.calls
+
+
+def run_pipeline(path, config, dispatch_mode, llm, run_index):
+    # main içe aktarıldığında LangSmith izlemeyi açar; ölçümde ağ çağrısı olmaması için kapatılır.
+    import main
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    config = dict(config, dispatch_mode=dispatch_mode, label_store_path=f"bench_labels_{run_index}.db")
+    agent, calls = llm
+    analyzer = main.LogAnalyzer(config, llm_agent=agent)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            analyzer.analyze(path)
+    finally:
+        analyzer.close()
+    return calls()
+
+
+def run_benchmarks(lines=50000, error_ratio=0.6, seed=42, repeat=3, stages=None,
+                   dispatch_mode="thread", llm_latency_ms=0.0, config=None, backend="stub",
+                   llm_error_rate=0.0, llm_malformed_rate=0.0, pool_latencies=None):
+    stages = stages or STAGES
+    config = dict(config or {})
+    workdir = tempfile.mkdtemp(prefix="log-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        path = generate_logs(os.path.join(workdir, "bench.txt"), lines, error_ratio=error_ratio, seed=seed)
+        all_lines = list(CollectorAgent().stream(path))
+        error_lines = [line for line in all_lines if is_error_log(line)]
+        results = {}
+
+        if "collect" in stages:
+            seconds, _ = best_of(lambda: list(CollectorAgent().stream(path)), repeat)
+            results["collect"] = stage_result(seconds, len(all_lines))
+
+        if "parse" in stages:
+            parser = compile_parser(config)
+            seconds, _ = best_of(lambda: parser.parse_many(all_lines), repeat)
+            results["parse"] = stage_result(seconds, len(all_lines))
+
+        if "normalize_lookup" in stages:
+            def lookup_all():
+                cache = LabelCache()
+                for line in error_lines[:SEED_LABELS]:
+                    cache.add(line, stub_label(line))
+                kinds = {}
+                for line in error_lines:
+                    norm = normalize_log(line)
+                    _, kind = cache.lookup(line, get_log_hash(line, norm=norm), norm)
+                    kinds[kind or "miss"] = kinds.get(kind or "miss", 0) + 1
+                return kinds
+            seconds, kinds = best_of(lookup_all, repeat)
+            results["normalize_lookup"] = stage_result(seconds, len(error_lines), lookups=kinds)
+
+        if "filter" in stages:
+            filter_agent = FilterAgent.from_config(config)
+            seconds, critical = best_of(lambda: sum(filter_agent.classify_many(error_lines)), repeat)
+            results["filter"] = stage_result(seconds, len(error_lines), critical=critical)
+
+        engine = None
+        if "analytics" in stages or "anomaly" in stages:
+            def consume():
+                return AnalyticsEngine(parser=compile_parser(config)).consume(error_lines)
+            seconds, engine = best_of(consume, repeat)
+            if "analytics" in stages:
+                results["analytics"] = stage_result(seconds, len(error_lines))
+
+        if "anomaly" in stages:
+            seconds, found = best_of(lambda: AnomalyAgent().evaluate_rollup(engine.rollup, window=5, threshold=3.0), repeat)
+            results["anomaly"] = stage_result(
+                seconds, len(error_lines), anomalies=len(found["anomalies"]), duration_anomalies=len(found["duration_anomalies"])
+            )
+
+        if "report" in stages:
+            labels = [stub_label(line) for line in error_lines]
+            def build_report():
+                report = ReportAgent(streaming=True)
+                for parsed in labels:
+                    report.update(parsed)
+                report.export()
+                report.plot_charts()
+                report.export_summary_table_by_interval()
+            seconds, _ = best_of(build_report, repeat)
+            results["report"] = stage_result(seconds, len(error_lines))
+
+        if "pipeline" in stages:
+            runs = iter(range(repeat))
+            seconds, calls = best_of(lambda: run_pipeline(
+                path, config, dispatch_mode,
+                make_llm_agent(backend, llm_latency_ms, llm_error_rate, llm_malformed_rate, seed, pool_latencies),
+                next(runs),
+            ), repeat)
+            results["pipeline"] = stage_result(seconds, len(all_lines), llm_calls=calls)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "lines": lines,
+            "error_ratio": error_ratio,
+            "seed": seed,
+            "repeat": repeat,
+            "dispatch_mode": dispatch_mode,
+            "llm_latency_ms": llm_latency_ms,
+            "backend": backend,
+            "llm_error_rate": llm_error_rate,
+            "llm_malformed_rate": llm_malformed_rate,
+            "pool_latencies": pool_latencies,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+        },
+        "stages": results,
+    }
+
+
+# Satır başı süreyi etkileyen ayarlar; taban değerle aynı olmadıkça karşılaştırma yapılmaz.
+COMPARABLE_META = ("lines", "error_ratio", "seed", "dispatch_mode", "llm_latency_ms", "backend",
+                   "llm_error_rate", "llm_malformed_rate", "pool_latencies")
+
+
+def meta_mismatch(results, baseline):
+    """Taban değerden farklı çalıştırma ayarlarını döner: [(ayar, taban, güncel)]."""
+    previous, current = baseline.get("meta", {}), results["meta"]
+    return [(key, previous.get(key), current.get(key)) for key in COMPARABLE_META
+            if previous.get(key) != current.get(key)]
+
+
+def compare_to_baseline(results, baseline, tolerance=0.25):
+    """
+    Satır başı süresi (us_per_line) taban değerin (1 + tolerance) katını aşan
+    aşamaları döner: [(aşama, taban, güncel, oran)].
+    """
+    regressions = []
+    for stage, current in results["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if not previous or not previous.get("us_per_line") or current.get("us_per_line") is None:
+            continue
+        ratio = current["us_per_line"] / previous["us_per_line"]
+        if ratio > 1 + tolerance:
+            regressions.append((stage, previous["us_per_line"], current["us_per_line"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aşama bazlı log analizi benchmark'ı.")
+    parser.add_argument("--lines", type=int, default=50000)
+    parser.add_argument("--error-ratio", type=float, default=0.6)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--stages", default=",".join(STAGES), help="virgülle ayrılmış aşama listesi")
+    parser.add_argument("--dispatch-mode", choices=["thread", "async"], default="thread")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--backend", choices=["stub", "synthetic", "pool"], default="stub",
+                        help="synthetic: LLMAgent + SyntheticBackend (JSON ayrıştırma dahil); "
+                             "pool: yerel sahte Ollama sunucularına giden arka uç havuzu")
+    parser.add_argument("--pool-latencies", default="",
+                        help="pool için virgülle ayrılmış sunucu gecikmeleri (ms), ör. 100,100,1500")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-malformed-rate", type=float, default=0.0)
+    parser.add_argument("--output", default="results/benchmark.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="izin verilen yavaşlama oranı")
+    parser.add_argument("--save-baseline", action="store_true", help="sonuçları taban değer olarak kaydet")
+    parser.add_argument("--no-compare", action="store_true", help="taban değerle karşılaştırmayı atla")
+    args = parser.parse_args(argv)
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"bilinmeyen aşama: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(
+        lines=args.lines, error_ratio=args.error_ratio, seed=args.seed, repeat=args.repeat,
+        stages=stages, dispatch_mode=args.dispatch_mode, llm_latency_ms=args.llm_latency_ms,
+        backend=args.backend, llm_error_rate=args.llm_error_rate, llm_malformed_rate=args.llm_malformed_rate,
+        pool_latencies=[float(value) for value in args.pool_latencies.split(",") if value.strip()] or None,
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'Aşama':<18}{'saniye':>10}{'satır/sn':>14}{'µs/satır':>11}")
+    for stage, result in results["stages"].items():
+        print(f"{stage:<18}{result['seconds']:>10.3f}{result['lines_per_sec'] or 0:>14.0f}{result['us_per_line'] or 0:>11.2f}")
+    print(f"Sonuçlar '{args.output}' dosyasına yazıldı.")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Taban değer '{args.baseline}' olarak kaydedildi.")
+        return 0
+
+    if args.no_compare:
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"Taban değer dosyası bulunamadı ({args.baseline}); --save-baseline ile kaydedin "
+              "ya da --no-compare ile karşılaştırmayı atlayın.")
+        return 2
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    mismatched = meta_mismatch(results, baseline)
+    if mismatched:
+        # Çalıştırma başına sabit maliyet satır sayısıyla ölçeklenmez; farklı ayarlar sahte gerileme gösterir.
+        print(f"\nTaban değer ({args.baseline}) farklı ayarlarla kaydedilmiş; karşılaştırılmadı:")
+        for key, previous, current in mismatched:
+            print(f"  {key}: {previous!r} → {current!r}")
+        print("Aynı ayarlarla çalıştırın, --save-baseline ile yeniden kaydedin ya da --no-compare kullanın.")
+        return 3
+    regressions = compare_to_baseline(results, baseline, tolerance=args.tolerance)
+    if regressions:
+        print(f"\nPERFORMANS GERİLEMESİ (tolerans %{args.tolerance * 100:.0f}):")
+        for stage, previous, current, ratio in regressions:
+            print(f"  {stage}: {previous:.2f} → {current:.2f} µs/satır ({ratio:.2f}x)")
+        return 1
+    print("Taban değere göre gerileme yok.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
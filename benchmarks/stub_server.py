@@ -0,0 +1,189 @@
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from agents.backends import synthetic_label
+
+_NUMBERED_RE = re.compile(r"^\[(\d+)\] (.*)$", re.MULTILINE)
+_SINGLE_RE = re.compile(r"^Log: (.*)$", re.MULTILINE)
+TRAILING_CHATTER = "\n\nBu etiketler log satırlarındaki hata mesajlarına göre belirlenmiştir." * 4
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.stub.count_connection()
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        stub = self.server.stub
+        if self.path == "/api/version" and not stub.failing:
+            self._send_json(200, {"version": "stub"})
+        else:
+            self._send_json(503 if stub.failing else 404, {"error": "unavailable"})
+
+    def do_POST(self):
+        stub = self.server.stub
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        stub.count_request()
+        if self.path != "/api/generate":
+            self._send_json(404, {"error": "not found"})
+            return
+        if stub.failing:
+            self._send_json(500, {"error": "stub failure"})
+            return
+        text, lines = stub.answer(body)
+        time.sleep((stub.latency_ms + stub.per_line_ms * lines) / 1000)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        size = stub.chunk_chars
+        try:
+            for start in range(0, len(text), size):
+                self._write_chunk({"model": body.get("model"), "response": text[start:start + size], "done": False})
+            self._write_chunk({"model": body.get("model"), "response": "", "done": True})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # İstemci JSON kapanınca bağlantıyı keser; kalan "üretim" yapılmaz.
+            stub.count_aborted()
+
+    def _write_chunk(self, message):
+        data = (json.dumps(message, ensure_ascii=False) + "\n").encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Akışı erken kapatan istemcinin kopardığı bağlantılar beklenen durumdur.
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class StubOllamaServer:
+    """
+    Ollama /api/generate ve /api/version uçlarını taklit eden yerel sunucu.
+
+    Yanıt, `format` şemasındaki alanlarla synthetic_label'dan üretilir ve
+    `chunk_chars`'lık NDJSON parçaları halinde akıtılır; JSON'un ardından
+    model gibi `trailing` açıklama metnini ekler (erken durdurmayı sınamak
+    için; boş verilirse JSON'un hemen ardından `done` gelir). Her istek
+    `latency_ms` + satır başı `per_line_ms` bekler; `failing` True iken
+    istekler ve sağlık kontrolü hata döner. `connections` açılan TCP
+    bağlantılarını sayar. Havuz ve devre kesici davranışını gerçek model
+    sunucusu olmadan denemek içindir.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=100.0, per_line_ms=0.0, chunk_chars=8,
+                 trailing=TRAILING_CHATTER):
+        self.latency_ms = latency_ms
+        self.per_line_ms = per_line_ms
+        self.chunk_chars = chunk_chars
+        self.trailing = trailing
+        self.failing = False
+        self.requests = 0
+        self.aborted = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def count_aborted(self):
+        with self._lock:
+            self.aborted += 1
+
+    def answer(self, body):
+        """İstek gövdesinden (yanıt metni, satır sayısı) üretir."""
+        schema = body.get("format") or {}
+        prompt = body.get("prompt", "")
+        batch = schema.get("type") == "array"
+        properties = (schema.get("items", {}) if batch else schema).get("properties", {})
+        fields = [field for field in properties if field != "index"]
+        if batch:
+            lines = [(int(index), line) for index, line in _NUMBERED_RE.findall(prompt)]
+            labels = [{"index": index, **_fields(line, fields)} for index, line in lines]
+            return json.dumps(labels, ensure_ascii=False) + self.trailing, len(lines)
+        match = _SINGLE_RE.search(prompt)
+        return json.dumps(_fields(match.group(1) if match else "", fields), ensure_ascii=False) + self.trailing, 1
+
+    def serve_forever(self):
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def _fields(line, fields):
+    label = synthetic_label(line)
+    return {field: label[field] for field in fields if field in label}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ollama API'sini taklit eden yerel test sunucusu.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--per-line-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    server = StubOllamaServer(args.host, args.port, latency_ms=args.latency_ms, per_line_ms=args.per_line_ms)
+    print(f"Sahte Ollama sunucusu {server.url} adresinde çalışıyor (Ctrl+C ile durdurun).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import asyncio
+import re
+import time
+
+from agents.parser import compile_parser
+
+_PARSER = compile_parser()
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def stub_label(log):
+    """
+    Satırdan deterministik bir etiket üretir (LLM yerine). Olay türünde
+    sayılar maskelenir; hesap/sorgu numaraları ayrı tür sayılmaz.
+    """
+    fields = _PARSER(log)
+    error = fields["error"]
+    message = error or "Unknown"
+    timestamp = fields["timestamp"]
+    return {
+        "event_type": _DIGITS_RE.sub("", message).strip(" :;")[:40].strip() or "Unknown",
+        "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S") if timestamp is not None else None,
+        "has_error": error is not None,
+        "user_action_successful": False,
+        "is_critical": "timeout" in message.lower() or "memory" in message.lower(),
+    }
+
+
+class StubLLMAgent:
+    """
+    LLMAgent ile aynı arayüze sahip sahte model. Her çağrı `latency_ms`
+    kadar bekler; böylece boru hattı ölçümü ağ ve model süresinden bağımsız olur.
+    """
+
+    def __init__(self, latency_ms=0.0):
+        self.latency = latency_ms / 1000
+        self.calls = 0
+
+    def analyze(self, log_line):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return stub_label(log_line)
+
+    def analyze_batch(self, log_lines):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [stub_label(line) for line in log_lines]
+
+    async def aanalyze(self, log_line):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return stub_label(log_line)
+
+    async def aanalyze_batch(self, log_lines):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [stub_label(line) for line in log_lines]
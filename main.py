@@ -1,406 +1,725 @@
 import os
-import re
 import json
-import hashlib
+import asyncio
 import time
+import logging
+import threading
+from contextlib import contextmanager
+from functools import partial
 from dotenv import load_dotenv
-from rapidfuzz import fuzz
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from queue import SimpleQueue, Empty
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from langsmith import traceable
-import csv
+from agents.parser import compile_parser, label_fields
 from agents.collector import CollectorAgent
 from agents.llm_agent import LLMAgent
 from agents.filter import FilterAgent
 from agents.alert import AlertAgent
 from agents.report import ReportAgent
-from agents.anomaly import AnomalyAgent
+from agents.anomaly import AnomalyAgent, anomaly_report
+from agents.similarity import normalize_log, get_log_hash, log_template
+from agents.label_cache import LabelCache
+from agents.log_cache import LogCacheManager
+from agents.analytics import AnalyticsEngine, analyze_sharded, is_error_log
+from agents.dispatcher import AsyncDispatcher, AdaptiveLimiter
+from agents.backends import create_backend
+from agents.classifier import LocalClassifier
+from agents.metrics import Metrics
+from agents.checkpoint import Checkpoint, checkpoint_path, config_fingerprint, file_identity
 
 load_dotenv()
 os.environ["LANGCHAIN_TRACING_V2"] = "true"
 
-collector = CollectorAgent()
-llm_agent = LLMAgent()
-filter_agent = FilterAgent()
-alert_agent = AlertAgent()
-report_agent = ReportAgent()
-anomaly_agent = AnomalyAgent()
-
+CONFIG_FILE = "config.json"
+ANOMALY_CONFIG_FILE = "anomaly_config.json"
 PROCESSED_LOGS_FILE = "processed_labels.json"
+LABEL_STORE_FILE = "processed_labels.db"
+REPORT_FILE = "results/report.json"
+ROLLUP_FILE = "results/rollup.npz"
+METRICS_PROM_FILE = "results/metrics.prom"
+METRICS_JSON_FILE = "results/metrics.json"
+CHECKPOINT_DIR = "results/checkpoints"
 SIMILARITY_THRESHOLD = 90
 MAX_WORKERS = 6
-
-if os.path.exists(PROCESSED_LOGS_FILE):
-    with open(PROCESSED_LOGS_FILE, "r") as f:
-        processed_logs = json.load(f)
-else:
-    processed_logs = {}
-
-with open("config.json", "r") as f:
-    config = json.load(f)
-
-def parse_log_line(log_line, config):
-    log_format = config.get("log_format", "custom")
-    delimiter = config.get("delimiter", ";")
-    encoding = config.get("encoding", "utf-8")
-    ts_field = config.get("timestamp_field", "TIMESTAMP")
-    service_field = config.get("service_field", "SERVICE")
-    duration_field = config.get("duration_field", "DURATION")
-    user_field = config.get("user_field", "USER")
-    error_field = config.get("error_field", "ERROR")
-    parsed = {}
-    if log_format == "json":
-        try:
-            data = json.loads(log_line)
-        except Exception:
-            return {}
-        parsed["timestamp"] = data.get(ts_field)
-        parsed["service"] = data.get(service_field)
-        parsed["duration"] = data.get(duration_field)
-        parsed["user"] = data.get(user_field)
-        parsed["error"] = data.get(error_field)
-    elif log_format == "csv":
-        reader = csv.DictReader([log_line], delimiter=delimiter)
-        for row in reader:
-            parsed["timestamp"] = row.get(ts_field)
-            parsed["service"] = row.get(service_field)
-            parsed["duration"] = row.get(duration_field)
-            parsed["user"] = row.get(user_field)
-            parsed["error"] = row.get(error_field)
-    else:  # custom
-        fields = dict(
-            (kv.split("=", 1)[0].strip(), kv.split("=", 1)[1].strip())
-            for kv in log_line.split(delimiter) if "=" in kv
-        )
-        parsed["timestamp"] = fields.get(ts_field)
-        parsed["service"] = fields.get(service_field)
-        parsed["duration"] = fields.get(duration_field)
-        parsed["user"] = fields.get(user_field)
-        parsed["error"] = fields.get(error_field)
-    return parsed
-
-def normalize_log(log):
-    log = re.sub(r"\d{4}-\d{2}-\d{2}[\s,:.\d]+", "", log)
-    log = re.sub(r"REQUESTID=[^;]+;", "", log)
-    return log.strip()
-
-def get_log_hash(log):
-    norm = normalize_log(log)
-    return hashlib.blake2b(norm.encode(), digest_size=16).hexdigest()
+LLM_BATCH_SIZE = 8
+LLM_RETRIES = 2
+MAX_IN_FLIGHT = MAX_WORKERS * 2
+LOG_FILE = "logs/server.txt"
+PROGRESS_EVERY = 500
+PARSE_CHUNK = 1024
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+logger = logging.getLogger(__name__)
+
+def setup_logging(config=None):
+    """Log seviyesi LOG_LEVEL ortam değişkeninden ya da config'teki "log_level"dan alınır (varsayılan INFO)."""
+    level = os.environ.get("LOG_LEVEL") or (config or {}).get("log_level", "INFO")
+    logging.basicConfig(level=getattr(logging, str(level).upper(), logging.INFO), format=LOG_FORMAT)
+    # httpx her model isteğini INFO seviyesinde loglar.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+def load_config(path=CONFIG_FILE):
+    with open(path, "r") as f:
+        return json.load(f)
+
+def load_anomaly_config(path=ANOMALY_CONFIG_FILE):
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            anomaly_config = json.load(f)
+        return anomaly_config.get("window", 5), anomaly_config.get("threshold", 3.0)
+    return 5, 3.0
 
 def should_skip(log):
     return "ERR=NONE" in log and "ERROR=" not in log
 
-def is_error_log(log):
-    return "ERROR=" in log or ": ERROR " in log
-
-@traceable(name="LogAnalysisRun")
-def analyze_log(log_line):
-    return llm_agent.analyze(log_line)
-
-def process_log(index_log_pair):
-    index, log = index_log_pair
-    print(f"\n[{index}/{total_logs}] log işleniyor...")
-
-    if should_skip(log):
-        print("Hata yok, atlanıyor.")
-        return None
-
-    start_time = time.time()
-
-    log_hash = get_log_hash(log)
-    norm_log = normalize_log(log)
-
-    for old in processed_logs.values():
-        if fuzz.ratio(norm_log, normalize_log(old["log"])) >= SIMILARITY_THRESHOLD:
-            print(f" %{SIMILARITY_THRESHOLD}+ benzer log bulundu. LLM'e gönderilmiyor.")
-            parsed = old["parsed"]
-            parsed["is_critical"] = filter_agent.is_critical(parsed, log_line=log)
-            return parsed
-
-    try:
-        llm_output = analyze_log(log)
-        print("LLM çıktısı:", llm_output)
-
-        parsed = json.loads(llm_output)
-    except json.JSONDecodeError:
-        json_matches = re.findall(r"\{[^{}]+\}", llm_output, re.DOTALL)
-        if not json_matches:
-            print("Geçerli JSON yok. Atlanıyor.")
-            return None
+class LogAnalyzer:
+    """
+    Süreç içinde tekrar kullanılabilen analiz servisi.
+
+    LLM istemcisi, etiket deposu ve önbelleği bir kez kurulur ve tüm analizlerde
+    sıcak tutulur; rapor, analitik ve anomali durumları her analyze() çağrısında
+    sıfırdan oluşturulur (kontrol noktası açıksa rapor ve analitik toplamları
+    oradan yüklenir). Aynı anda tek bir analiz çalışır.
+    """
+
+    def __init__(self, config=None, llm_agent=None):
+        self.config = config if config is not None else load_config()
+        self.collector = CollectorAgent()
+        # Aşama gecikmeleri ve sayaçlar; her analyze() çağrısında sıfırlanır.
+        self.metrics = Metrics(enabled=self.config.get("metrics_enabled", True))
+        self.alert_agent = AlertAgent()
+        # Kritik anahtar kelimeler tek seferde derlenir; config ile genişletilebilir.
+        self.filter_agent = FilterAgent.from_config(self.config)
+
+        # Etiketler kalıcı SQLite deposunda tutulur; açılış maliyeti önbellek boyutundan bağımsızdır.
+        ttl_days = self.config.get("label_store_ttl_days")
+        self.label_store = LogCacheManager(
+            self.config.get("label_store_path", LABEL_STORE_FILE),
+            max_entries=self.config.get("label_store_max_entries", 100000),
+            ttl_seconds=ttl_days * 86400 if ttl_days else None,
+        )
+        self.label_cache = LabelCache(threshold=SIMILARITY_THRESHOLD, store=self.label_store)
+
+        # İlk çalıştırmada eski JSON önbelleği depoya aktarılır.
+        if len(self.label_store) == 0 and os.path.exists(PROCESSED_LOGS_FILE):
+            with open(PROCESSED_LOGS_FILE, "r") as f:
+                self.label_cache.load(json.load(f))
+
+        # Önbellekte bulunmayan loglar önce depodaki LLM etiketleriyle eğitilen yerel
+        # sınıflandırıcıya sorulur; yalnızca düşük güvenli olanlar LLM'e gider.
+        self.classifier = None
+        if self.config.get("classifier_enabled", False):
+            self.classifier = LocalClassifier(
+                threshold=self.config.get("classifier_threshold", 0.5),
+                margin=self.config.get("classifier_margin", 0.2),
+                min_class_examples=self.config.get("classifier_min_examples", 3),
+                retrain_every=self.config.get("classifier_retrain_every", 200),
+            )
+            self.classifier.load_store(self.label_store)
+
+        # llm_agent verilirse (ör. benchmark'taki sahte model) kullanılır; aksi halde
+        # config'teki "llm_backend" (ollama / replay / synthetic) ile LLMAgent kurulur.
+        if llm_agent is None:
+            llm_agent = LLMAgent(metrics=self.metrics, backend=create_backend(self.config, label_store=self.label_store),
+                                 backend_options=self.config.get("llm_backend_options"))
+        self.llm_agent = llm_agent
+
+        self._run_lock = threading.Lock()
+        self.report_agent = None
+        self.anomaly_agent = None
+        self.analytics = None
+        self._inline_analytics = True
+        self._read_range = (0, None)
+        self._progress = None
+
+    def close(self):
+        self.label_store.close()
+        close = getattr(getattr(self.llm_agent, "backend", None), "close", None)
+        if close is not None:
+            close()
+
+    @property
+    def llm_workers(self):
+        """LLM iş parçacığı sayısı; arka uç havuzu daha fazla eşzamanlı istek kaldırıyorsa ona göre artar."""
+        capacity = getattr(getattr(self.llm_agent, "backend", None), "capacity", 0)
+        return max(MAX_WORKERS, capacity)
+
+    def _report_progress(self, fraction, message):
+        if self._progress is not None:
+            self._progress(min(max(fraction, 0.0), 1.0), message)
+
+    @contextmanager
+    def track_llm_call(self, lines):
+        metrics = self.metrics
+        metrics.inc("llm_calls_total")
+        metrics.inc("llm_lines_total", lines)
+        metrics.add_gauge("llm_in_flight", 1)
+        start = time.perf_counter()
         try:
-            parsed = json.loads(json_matches[0])
-        except:
-            print("JSON fallback başarısız. Atlanıyor.")
+            yield
+        except Exception:
+            metrics.inc("llm_errors_total")
+            raise
+        finally:
+            metrics.observe("llm_call", time.perf_counter() - start)
+            metrics.add_gauge("llm_in_flight", -1)
+
+    @traceable(name="LogAnalysisRun")
+    def analyze_logs(self, log_lines):
+        with self.track_llm_call(len(log_lines)):
+            return self.llm_agent.analyze_batch(log_lines)
+
+    @traceable(name="LogAnalysisRun")
+    async def aanalyze_logs(self, log_lines):
+        with self.track_llm_call(len(log_lines)):
+            return await self.llm_agent.aanalyze_batch(log_lines)
+
+    def call_llm(self, log_lines):
+        """
+        Thread modunda LLM çağrısı: hata durumunda LLM_RETRIES kez artan
+        beklemeyle yeniden denenir, yine başarısızsa parti etiketsiz atlanır.
+        """
+        for attempt in range(LLM_RETRIES + 1):
+            try:
+                return self.analyze_logs(log_lines)
+            except Exception as e:
+                if attempt == LLM_RETRIES:
+                    self.metrics.inc("llm_failed_batches_total")
+                    logger.warning("LLM isteği başarısız, parti atlanıyor: %s", e)
+                    return [None] * len(log_lines)
+                time.sleep(0.5 * (attempt + 1))
+
+    def complete_label(self, parsed, log, keyword_hit=None, fields=None):
+        """
+        Zaman, süre, kaynak, yol ve hata alanlarını satırın ayrıştırılmış
+        halinden (fields; verilmezse satır burada ayrıştırılır) etikete yazar
+        (önbellekten gelen etiketlerdeki başka satıra ait değerler de böylece
+        düzelir) ve kritikliği işaretler. Anahtar kelime taraması plan_chunk'ta
+        parça başına tek regex taramasıyla yapılır ve sonucu keyword_hit olarak
+        gelir; verilmezse satır burada ayrıca taranır.
+        """
+        start = time.perf_counter()
+        if fields is None:
+            fields = self.analytics.parser(log)
+        parsed.update(label_fields(fields))
+        extracted = time.perf_counter()
+        parsed["is_critical"] = self.filter_agent.is_critical(parsed, log_line=log, keyword_hit=keyword_hit)
+        metrics = self.metrics
+        metrics.observe("extract", extracted - start)
+        metrics.observe("filter", time.perf_counter() - extracted)
+        return parsed
+
+    def lookup_log(self, index, log, norm_log=None):
+        """
+        Logu etiket önbelleğinde arar ve (parsed, miss, future) döner:
+        önbellekte ya da sınıflandırıcıda bulunursa satıra henüz uygulanmamış
+        etiket kopyası (parsed); LLM çağrısının sahibi bu logsa miss; aynı şablon
+        için başka bir çağrı sürüyorsa miss ile birlikte beklenecek future.
+        miss = (indeks, log, norm, hash, şablon, üyeler); üyeler etiketi
+        paylaşacak (satır, anahtar kelime sonucu, ayrıştırılmış alanlar)
+        üçlüleridir, temsilci dahil (plan_chunk doldurur).
+        """
+        metrics = self.metrics
+        logger.debug("[%d] log işleniyor...", index)
+
+        start = time.perf_counter()
+        if norm_log is None:
+            norm_log = normalize_log(log)
+        log_hash = get_log_hash(log, norm=norm_log)
+        normalized = time.perf_counter()
+        metrics.observe("normalize", normalized - start)
+
+        old, match_kind = self.label_cache.lookup(log, log_hash=log_hash, norm=norm_log)
+        metrics.observe("cache_lookup", time.perf_counter() - normalized)
+        if old is not None:
+            metrics.inc("cache_lookups_total", result=match_kind)
+            logger.debug("[%d] %%%d+ benzer log bulundu (%s). LLM'e gönderilmiyor.", index, SIMILARITY_THRESHOLD, match_kind)
+            return dict(old["parsed"]), None, None
+
+        if self.classifier is not None:
+            classified = time.perf_counter()
+            predicted, _ = self.classifier.predict(norm_log)
+            metrics.observe("classify", time.perf_counter() - classified)
+            if predicted is not None:
+                metrics.inc("cache_lookups_total", result="classifier")
+                logger.debug("[%d] Yerel sınıflandırıcı ile etiketlendi. LLM'e gönderilmiyor.", index)
+                return predicted, None, None
+
+        key = self.label_cache.flight_key(norm_log)
+        miss = (index, log, norm_log, log_hash, key, [])
+        future, owner = self.label_cache.claim(key)
+        if owner:
+            metrics.inc("cache_lookups_total", result="miss")
+            return None, miss, None
+        metrics.inc("cache_lookups_total", result="coalesced")
+        logger.debug("[%d] Aynı şablon için LLM çağrısı sürüyor, sonucu bekleniyor.", index)
+        return None, miss, future
+
+    def plan_chunk(self, chunk, fields, first_index, sink, leftover):
+        """
+        Bir hata logu grubunu LLM'den önce planlar: satırlar tek geçişte
+        şablonlarına (kimlik, sayı ve REQUESTID maskelenmiş hali) göre
+        gruplanır ve yalnızca her şablonun ilk satırı (temsilci) önbellekte,
+        sınıflandırıcıda ya da LLM'de aranır; bulunan etiket gruptaki tüm
+        satırlara kendi deterministik alanlarıyla uygulanır. fields, grubun
+        iter_error_chunks'ta ayrıştırılmış halidir; satırlar yeniden ayrıştırılmaz.
+
+        (etiketlenen sonuçlar, LLM'e gidecek miss'ler) döner. Aynı şablon için
+        başka bir çağrı sürüyorsa grup o sonucu bekler: sonuç geldiğinde
+        etiketler sink'e verilir, uygun değilse miss leftover'a eklenir.
+        """
+        metrics = self.metrics
+        start = time.perf_counter()
+        flags = self.filter_agent.classify_many(chunk)
+        metrics.observe("filter", time.perf_counter() - start)
+        start = time.perf_counter()
+        groups = {}  # şablon -> [temsilci indeksi, temsilci, norm, üyeler]
+        skipped = 0
+        for index, log, flag, parsed_log in zip(range(first_index, first_index + len(chunk)), chunk, flags, fields):
+            if should_skip(log):
+                skipped += 1
+                continue
+            # Anahtar kelime sonucu ve alanlar satırla birlikte taşınır; grup etiketlenmese de iz bırakmaz.
+            member = (log, flag, parsed_log)
+            norm_log = normalize_log(log)
+            template = log_template(norm_log)
+            group = groups.get(template)
+            if group is None:
+                groups[template] = [index, log, norm_log, [member]]
+            else:
+                group[3].append(member)
+        metrics.observe("plan", time.perf_counter() - start)
+        if skipped:
+            metrics.inc("lines_skipped_total", skipped)
+        metrics.inc("plan_templates_total", len(groups))
+
+        results = []
+        misses = []
+        for index, log, norm_log, members in groups.values():
+            if len(members) > 1:
+                # Üyeler ayrıca aranmaz; temsilcinin şablon eşleşmesiyle etiketlenir.
+                metrics.inc("cache_lookups_total", len(members) - 1, result="template")
+            parsed, miss, future = self.lookup_log(index, log, norm_log)
+            if parsed is not None:
+                results.extend(self.apply_label(parsed, members))
+                continue
+            miss[5].extend(members)
+            if future is None:
+                misses.append(miss)
+            else:
+                future.add_done_callback(lambda f, miss=miss: self._on_resolved(miss, f, sink, leftover))
+        return results, misses
+
+    def _on_resolved(self, miss, future, sink, leftover):
+        results = self.settle_waiter(miss, future.result())
+        if results is not None:
+            sink(results)
+        else:
+            leftover.append(miss)
+
+    def apply_label(self, parsed, members):
+        """Bir şablon etiketini gruptaki her satıra (temsilci dahil) kendi alanlarıyla uygular."""
+        return [self.complete_label(dict(parsed), line, keyword_hit=flag, fields=fields)
+                for line, flag, fields in members]
+
+    def finish_batch(self, misses, outputs, owned=True):
+        results = []
+        for (index, log, norm_log, log_hash, key, members), parsed in zip(misses, outputs):
+            if parsed is None:
+                self.metrics.inc("llm_unlabeled_total", len(members))
+                logger.debug("[%d] Geçerli JSON yok. Atlanıyor.", index)
+                if owned:
+                    self.label_cache.resolve(key, None)
+                continue
+            logger.debug("[%d] LLM çıktısı: %s", index, parsed)
+            self.label_cache.add(log, dict(parsed), log_hash=log_hash, norm=norm_log)
+            if self.classifier is not None:
+                self.classifier.add(norm_log, dict(parsed))
+            if owned:
+                self.label_cache.resolve(key, {"log": log, "parsed": dict(parsed), "norm": norm_log})
+            results.extend(self.apply_label(parsed, members))
+        return results
+
+    def release_misses(self, misses):
+        # Hata durumunda bekleyenler sonsuza dek kalmasın; çözülmüş anahtarlar için etkisizdir.
+        for miss in misses:
+            self.label_cache.resolve(miss[4], None)
+
+    def settle_waiter(self, miss, entry):
+        """Bekleyen grubu sahibin sonucuyla etiketler; sonuç uygun değilse None döner."""
+        index, _, norm_log, _, _, members = miss
+        if not self.label_cache.accepts(norm_log, entry):
             return None
+        logger.debug("[%d] Aynı şablonun LLM sonucu kullanıldı.", index)
+        return self.apply_label(entry["parsed"], members)
+
+    def process_misses(self, misses, owned=True):
+        """
+        Thread modunda bir miss partisini tek LLM isteğinde analiz ettirir;
+        sahip olunan şablon anahtarları hata olsa da çözülür ki bekleyen
+        gruplar takılı kalmasın.
+        """
+        start_time = time.perf_counter()
+        try:
+            results = self.finish_batch(misses, self.call_llm([miss[1] for miss in misses]), owned=owned)
+        finally:
+            if owned:
+                self.release_misses(misses)
+        logger.debug("İşlem süre: %.2f ms (%d log)", (time.perf_counter() - start_time) * 1000, len(misses))
+        return results
+
+    async def aprocess_misses(self, misses, owned=True):
+        start_time = time.perf_counter()
+        results = self.finish_batch(misses, await self.aanalyze_logs([miss[1] for miss in misses]), owned=owned)
+        logger.debug("İşlem süre: %.2f ms (%d log)", (time.perf_counter() - start_time) * 1000, len(misses))
+        return results
+
+    def iter_error_chunks(self, path, config):
+        """
+        Hata loglarını akış halinde PARSE_CHUNK'lık gruplar olarak (grup,
+        ayrıştırılmış alanlar) biçiminde üretir; her grup bir kez toplu
+        ayrıştırılıp analitiğe işlenir (parçalı modda analitik ayrı süreçlerde
+        yürüdüğünden atlanır), alanlar etiketlemede yeniden kullanılır ve
+        ilerleme (okunan bayt oranı, yaklaşık) bildirilir. "collect" aşaması, bir grubun okunup hata
+        loglarının ayıklanma süresidir; tüketicide geçen süre dahil değildir.
+        Kontrol noktasından devam ediliyorsa yalnızca _read_range okunur.
+        """
+        parser = self.analytics.parser
+        metrics = self.metrics
+        start, end = self._read_range
+        if end is None:
+            end = os.path.getsize(path) if os.path.exists(path) else 0
+        total_bytes = end - start
+        read_bytes = 0
+        count = 0
+        chunk = []
+        started = time.perf_counter()
+        lines = self.collector.stream(path, encoding=config.get("encoding", "utf-8"), start=start, end=end)
+        for count, log in enumerate(lines, 1):
+            read_bytes += len(log) + 1
+            if total_bytes and count % PROGRESS_EVERY == 0:
+                self._report_progress(0.9 * read_bytes / total_bytes, f"{count} satır okundu")
+            if parser.needs_header:
+                parser.set_header(log)
+                continue
+            if is_error_log(log):
+                chunk.append(log)
+                if len(chunk) >= PARSE_CHUNK:
+                    metrics.observe("collect", time.perf_counter() - started)
+                    yield chunk, self.consume_chunk(chunk)
+                    chunk = []
+                    started = time.perf_counter()
+        metrics.inc("lines_read_total", count)
+        if chunk:
+            metrics.observe("collect", time.perf_counter() - started)
+            yield chunk, self.consume_chunk(chunk)
+
+    def consume_chunk(self, chunk):
+        """Grubu bir kez ayrıştırır, analitiğe işler ve ayrıştırılmış alanları döner."""
+        self.metrics.inc("error_lines_total", len(chunk))
+        with self.metrics.timer("parse"):
+            fields = self.analytics.parser.parse_many(chunk)
+        if self._inline_analytics:
+            with self.metrics.timer("analytics"):
+                self.analytics.consume(chunk, fields)
+        return fields
+
+    def report_result(self, parsed):
+        start = time.perf_counter()
+        self.report_agent.update(parsed)
+        self.metrics.observe("report_update", time.perf_counter() - start)
+
+    def report_results(self, results):
+        for result in results:
+            self.report_result(result)
+
+    def iter_miss_batches(self, path, config, leftover, sink=None):
+        """
+        Async mod için üretici: her grup plan_chunk ile planlanır, önbellek
+        isabetleri sink'e (varsayılan report_results) verilir, yalnızca LLM
+        çağrısının sahibi olunan şablon temsilcileri LLM_BATCH_SIZE'lık
+        partiler halinde üretilir. Aynı şablonu bekleyen gruplar sahibin sonucu
+        geldiğinde etiketlenir; sonuç uygun değilse leftover listesine eklenir.
+        """
+        sink = sink or self.report_results
+        misses = []
+        index = 1
+        for chunk, fields in self.iter_error_chunks(path, config):
+            results, planned = self.plan_chunk(chunk, fields, index, sink, leftover)
+            index += len(chunk)
+            sink(results)
+            misses.extend(planned)
+            while len(misses) >= LLM_BATCH_SIZE:
+                yield misses[:LLM_BATCH_SIZE]
+                misses = misses[LLM_BATCH_SIZE:]
+        if misses:
+            yield misses
+
+    def run_threaded(self, path, config):
+        # Dosya akış halinde okunur ve her grup plan_chunk ile planlanır; yalnızca
+        # şablon temsilcileri LLM_BATCH_SIZE'lık partiler halinde gönderilir ve
+        # bellekte en fazla iş parçacığı sayısının iki katı parti bekler. Başka
+        # partinin sonucunu bekleyen gruplar iş parçacığı tutmaz; etiketleri
+        # settled kuyruğundan bu (rapor) iş parçacığında yazılır.
+        workers = self.llm_workers
+        max_in_flight = max(MAX_IN_FLIGHT, workers * 2)
+        settled = SimpleQueue()
+        leftover = []
+
+        def drain():
+            while True:
+                try:
+                    self.report_results(settled.get_nowait())
+                except Empty:
+                    return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+
+            def submit(batch, owned=True):
+                nonlocal pending
+                pending.add(executor.submit(self.process_misses, batch, owned))
+                self.metrics.set_gauge("llm_queue_depth", len(pending))
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.report_results(future.result())
+                drain()
+
+            misses = []
+            index = 1
+            for chunk, fields in self.iter_error_chunks(path, config):
+                results, planned = self.plan_chunk(chunk, fields, index, settled.put, leftover)
+                index += len(chunk)
+                self.report_results(results)
+                misses.extend(planned)
+                while len(misses) >= LLM_BATCH_SIZE:
+                    submit(misses[:LLM_BATCH_SIZE])
+                    misses = misses[LLM_BATCH_SIZE:]
+                drain()
+            if misses:
+                submit(misses)
+            self.metrics.set_gauge("llm_queue_depth", len(pending))
+            for future in as_completed(pending):
+                self.report_results(future.result())
+            drain()
+
+            # Sahibin sonucunu kullanamayan gruplar kendi temsilcileriyle gönderilir.
+            pending = set()
+            for i in range(0, len(leftover), LLM_BATCH_SIZE):
+                submit(leftover[i:i + LLM_BATCH_SIZE], owned=False)
+            for future in as_completed(pending):
+                self.report_results(future.result())
+
+    def run_async(self, path, config):
+        asyncio.run(self.arun_async(path, config))
+
+    async def arun_async(self, path, config):
+        # Eşzamanlılık sabit değil; gecikme ve hata oranına göre AIMD ile ayarlanır.
+        # Tüm partiler tek olay döngüsünde gönderilir; döngüye bağlı model istemcisi sonda kapatılır.
+        # Üretici dispatcher tarafından bir iş parçacığında ilerletilir; rapor tek yazarlı
+        # kalsın diye onun etiketleri de olay döngüsüne aktarılarak yazılır.
+        loop = asyncio.get_running_loop()
+
+        def sink(results):
+            loop.call_soon_threadsafe(self.report_results, results)
+
+        max_limit = config.get("max_concurrency", 32)
+        limiter = AdaptiveLimiter(initial=min(self.llm_workers, max_limit), max_limit=max_limit)
+        dispatcher = AsyncDispatcher(
+            self.aprocess_misses, limiter=limiter, queue_size=MAX_IN_FLIGHT,
+            on_result=self.report_results, on_failure=self.release_misses, metrics=self.metrics,
+        )
+        leftover = []
+        aclose = getattr(getattr(self.llm_agent, "backend", None), "aclose", None)
+        try:
+            await dispatcher.arun(self.iter_miss_batches(path, config, leftover, sink))
+            if leftover:
+                retry = AsyncDispatcher(
+                    partial(self.aprocess_misses, owned=False), limiter=limiter, queue_size=MAX_IN_FLIGHT,
+                    on_result=self.report_results, metrics=self.metrics,
+                )
+                await retry.arun(leftover[i:i + LLM_BATCH_SIZE] for i in range(0, len(leftover), LLM_BATCH_SIZE))
+        finally:
+            if aclose is not None:
+                await aclose()
+        logger.info("LLM eşzamanlılık sınırı: %.1f (hata: %d, atlanan parti: %d)", limiter.limit, limiter.errors, dispatcher.failed)
+
+    def analyze(self, path=LOG_FILE, config=None, progress=None):
+        """
+        Log dosyasını analiz eder, results/ altındaki rapor ve grafikleri yazar
+        ve birleştirilmiş raporu (results/report.json içeriği) döner.
+        progress verilirse progress(oran, mesaj) ile ilerleme bildirilir.
+        """
+        with self._run_lock:
+            config = config if config is not None else self.config
+            if config is not self.config:
+                self.filter_agent = FilterAgent.from_config(config)
+            self.report_agent = ReportAgent(
+                streaming=config.get("report_streaming", False),
+                spill_path=config.get("report_spill_path") or None,
+            )
+            self.anomaly_agent = AnomalyAgent()
+            self.metrics = Metrics(enabled=config.get("metrics_enabled", True))
+            if hasattr(self.llm_agent, "metrics"):
+                self.llm_agent.metrics = self.metrics
+            if hasattr(getattr(self.llm_agent, "backend", None), "metrics"):
+                self.llm_agent.backend.metrics = self.metrics
+            self.analytics = AnalyticsEngine(
+                parser=compile_parser(config), session_gap_seconds=config.get("session_gap_seconds", 1800),
+            )
+            self._progress = progress
+            try:
+                return self._analyze(path, config)
+            finally:
+                self._progress = None
+                self._read_range = (0, None)
+
+    def resume_checkpoint(self, path, config):
+        """
+        "checkpoint_enabled" açıksa dosyanın kontrol noktasını açar: dosya
+        yalnızca sonuna eklenerek büyüdüyse kaydedilmiş rapor ve analitik
+        toplamları yüklenir ve okuma kalınan bayttan başlar. Okuma son tam
+        satırda biter; (kontrol noktası, bitişteki dosya kimliği) döner,
+        kapalıysa (None, None).
+        """
+        if not config.get("checkpoint_enabled", False) or not os.path.exists(path):
+            return None, None
+        checkpoint = Checkpoint(checkpoint_path(config.get("checkpoint_dir", CHECKPOINT_DIR), path))
+        start, state = checkpoint.resume(path, config_fingerprint(config))
+        if state is not None:
+            self.report_agent = state["report"]
+            self.analytics = state["analytics"]
+        end = self.collector.line_end(path, start)
+        self._read_range = (start, end)
+        if state is not None:
+            logger.info("Kontrol noktasından devam: %d bayt işlenmiş, %d yeni bayt okunacak.", start, end - start)
+        return checkpoint, file_identity(path, end)
+
+    def _analyze(self, path, config):
+        self._report_progress(0.0, "Analiz başladı")
+        checkpoint, identity = self.resume_checkpoint(path, config)
+        # analytics_workers > 1 ise deterministik analitik, LLM dağıtımıyla
+        # eşzamanlı olarak bayt aralıklarına bölünüp ayrı süreçlerde hesaplanır.
+        workers = config.get("analytics_workers", 0)
+        sharded = ThreadPoolExecutor(max_workers=1) if workers and workers > 1 else None
+        if sharded is not None:
+            start, end = self._read_range
+            analytics_future = sharded.submit(analyze_sharded, path, config, workers, start=start, end=end)
+        self._inline_analytics = sharded is None
+
+        if config.get("dispatch_mode", "thread") == "async":
+            self.run_async(path, config)
+        else:
+            self.run_threaded(path, config)
+
+        if sharded is not None:
+            # Yeni aralığın sonucu, kontrol noktasından gelen toplamların ardına eklenir.
+            self.analytics = self.analytics.merge(analytics_future.result())
+            sharded.shutdown()
+            self._inline_analytics = True
+
+        if self.classifier is not None and self.classifier.retrain():
+            logger.info("Yerel sınıflandırıcı %d etiketle yeniden eğitildi.", len(self.classifier))
+
+        evicted = self.label_store.evict()
+        if evicted:
+            logger.info("Etiket deposundan %d eski kayıt çıkarıldı.", evicted)
+
+        self._report_progress(0.9, "Rapor hazırlanıyor")
+        report_agent = self.report_agent
+        anomaly_agent = self.anomaly_agent
+        analytics = self.analytics
+
+        report_agent.summary()
+        with self.metrics.timer("report_export"):
+            report_agent.export()
+            report_agent.plot_charts()
+            report_agent.export_summary_table_by_interval()
+
+        analytics.print_report()
+        os.makedirs("results", exist_ok=True)
+        analytics.plot_time_series('results/log_error_timeseries.png')
+
+        analytics.rollup.save(ROLLUP_FILE)
+        error_messages = analytics.error_messages
+        window_size, threshold = load_anomaly_config()
+
+        # Anomaliler kaydedilen dakikalık küp üzerinden hesaplanır; arayüz aynı
+        # küpü farklı pencere/eşik değerleriyle yeniden değerlendirir.
+        evaluated = anomaly_agent.evaluate_rollup(analytics.rollup, window=window_size, threshold=threshold, min_count=10)
+        anomalies = evaluated["anomalies"]
+        error_message_anomalies = evaluated["error_message_anomalies"]
+        duration_anomalies = evaluated["duration_anomalies"]
+
+        if anomalies:
+            print("[AGENT] Zaman serisi anomalileri:")
+            for ts, count in anomalies:
+                print(f"  {ts}: {count} log (kayan pencere anomali)")
+        else:
+            print("[AGENT] Zaman serisinde anomali yok.")
+
+        if error_message_anomalies:
+            print("[AGENT] Hata mesajı anomalileri:")
+            for msg, count in error_message_anomalies:
+                print(f"  {msg}: {count} kez")
+        else:
+            print("[AGENT] Hata mesajı anomalisi yok.")
+
+        if duration_anomalies:
+            print("[DURATION ANOMALİ] Ortalama işlem süresi anomalileri:")
+            for ts, val in duration_anomalies:
+                print(f"  {ts}: {val:.2f} ms (ortalama+{threshold}σ üstü)")
+        else:
+            print("[DURATION ANOMALİ] Anomali tespit edilmedi.")
+
+        report_data = {"error_messages": dict(error_messages), "sketches": analytics.sketch_summary()}
+        report_data.update(anomaly_report(anomalies, error_message_anomalies, duration_anomalies, threshold))
+
+        report = {}
+        if os.path.exists(REPORT_FILE):
+            with open(REPORT_FILE, "r") as f:
+                report = json.load(f)
+        report.update(report_data)
+        with open(REPORT_FILE, "w") as f:
+            json.dump(report, f, indent=2)
+
+        if self.metrics.enabled:
+            self.metrics.export(METRICS_PROM_FILE, METRICS_JSON_FILE)
+            cache = self.metrics.cache_ratios()
+            logger.info(
+                "Önbellek: %d arama, isabet %%%.1f, benzer %%%.1f, sınıflandırıcı %%%.1f, "
+                "süren çağrıyı bekleyen %%%.1f, ıska %%%.1f; metrikler '%s' ve '%s' dosyalarına yazıldı.",
+                cache["lookups"], 100 * cache["hit_ratio"], 100 * cache["fuzzy_ratio"],
+                100 * cache["classifier_ratio"], 100 * cache["coalesced_ratio"], 100 * cache["miss_ratio"],
+                METRICS_PROM_FILE, METRICS_JSON_FILE,
+            )
+
+        stats = getattr(getattr(self.llm_agent, "backend", None), "stats", None)
+        if stats is not None:
+            for endpoint in stats():
+                logger.info(
+                    "Model arka ucu %s: %d istek, %d hata, ort. %s ms, devre %s",
+                    endpoint["endpoint"], endpoint["requests"], endpoint["errors"],
+                    endpoint["latency_ms"], endpoint["circuit"],
+                )
+
+        if checkpoint is not None:
+            checkpoint.save(path, identity, config_fingerprint(config),
+                            {"report": report_agent, "analytics": analytics})
+
+        self._report_progress(1.0, "Analiz tamamlandı")
+        return report
+
+def analyze(path=LOG_FILE, config=None, progress=None):
+    """Tek seferlik analiz: servis kurulur, çalıştırılır ve kapatılır."""
+    config = config if config is not None else load_config()
+    setup_logging(config)
+    analyzer = LogAnalyzer(config)
+    try:
+        return analyzer.analyze(path, progress=progress)
+    finally:
+        analyzer.close()
 
-    if not isinstance(parsed, dict):
-        print("JSON değil. Atlanıyor.")
-        return None
-
-    processed_logs[log_hash] = {"log": log, "parsed": parsed}
-    parsed["is_critical"] = filter_agent.is_critical(parsed, log_line=log)
-
-    duration_ms = (time.time() - start_time) * 1000
-    print(f"İşlem süre: {duration_ms:.2f} ms")
-    return parsed
-
-logs = collector.from_file()
-parsed_logs = [parse_log_line(log, config) for log in logs]
-
-logs = [log for log in logs if is_error_log(log)]
-total_logs = len(logs)
-
-
-with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-    futures = [executor.submit(process_log, (i, log)) for i, log in enumerate(logs, 1)]
-    for future in as_completed(futures):
-        result = future.result()
-        if result:
-            report_agent.update(result)
-
-with open(PROCESSED_LOGS_FILE, "w") as f:
-    json.dump(processed_logs, f, indent=2)
-
-report_agent.summary()
-report_agent.export()
-report_agent.plot_charts()
-report_agent.export_summary_table_by_interval()
-
-from datetime import datetime, timedelta
-from collections import defaultdict, Counter
-
-def extract_timestamp(log):
-    match = re.match(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3})", log)
-    if match:
-        return datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S,%f")
-    return None
-
-def extract_requestid(log):
-    match = re.search(r"REQUESTID=([^;]+);", log)
-    if match:
-        return match.group(1)
-    return None
-
-def extract_duration(log):
-    match = re.search(r"DURATION=(\d+);", log)
-    if match:
-        return int(match.group(1))
-    return None
-
-previous_time = None
-log_time_deltas = []
-for i, log in enumerate(logs, 1):
-    current_time = extract_timestamp(log)
-    if previous_time and current_time:
-        delta = (current_time - previous_time).total_seconds() * 1000  # ms
-        log_time_deltas.append(delta)
-    previous_time = current_time
-if log_time_deltas:
-    print(f"\n[EK ANALİZ] Ortalama loglar arası süre farkı: {sum(log_time_deltas)/len(log_time_deltas):.2f} ms (min: {min(log_time_deltas):.2f}, max: {max(log_time_deltas):.2f})")
-
-request_times = defaultdict(list)
-for log in logs:
-    ts = extract_timestamp(log)
-    reqid = extract_requestid(log)
-    if ts and reqid:
-        request_times[reqid].append(ts)
-request_durations = []
-for reqid, times in request_times.items():
-    if len(times) > 1:
-        duration = (max(times) - min(times)).total_seconds() * 1000
-        request_durations.append(duration)
-if request_durations:
-    print(f"[EK ANALİZ] Ortalama işlem (REQUESTID) süresi: {sum(request_durations)/len(request_durations):.2f} ms (min: {min(request_durations):.2f}, max: {max(request_durations):.2f})")
-
-all_durations = [extract_duration(log) for log in logs if extract_duration(log) is not None]
-if all_durations:
-    print(f"[EK ANALİZ] DURATION ortalaması: {sum(all_durations)/len(all_durations):.2f} ms, max: {max(all_durations)} ms, min: {min(all_durations)} ms")
-    threshold = 1000  # ms
-    above_threshold = [d for d in all_durations if d > threshold]
-    print(f"[EK ANALİZ] {threshold} ms üstü DURATION sayısı: {len(above_threshold)}")
-
-time_buckets = Counter()
-for log in logs:
-    ts = extract_timestamp(log)
-    if ts:
-        bucket = ts.replace(second=0, microsecond=0)
-        time_buckets[bucket] += 1
-if time_buckets:
-    most_common_time, most_common_count = time_buckets.most_common(1)[0]
-    print(f"[EK ANALİZ] En yoğun dakika: {most_common_time} ({most_common_count} log)")
-
-error_count = sum(1 for log in logs if is_error_log(log))
-print(f"[EK ANALİZ] Toplam log: {len(logs)}, Hata içeren log: {error_count}, Hata oranı: {100*error_count/len(logs):.2f}%\n")
-
-import matplotlib.pyplot as plt
-
-error_messages = []
-for log in logs:
-    match = re.search(r"ERROR=([^;]+);", log)
-    if match:
-        error_messages.append(match.group(1).strip())
-if error_messages:
-    error_counter = Counter(error_messages)
-    print("[EK ANALİZ] En çok görülen hata mesajları:")
-    for msg, count in error_counter.most_common(5):
-        print(f"  {msg}: {count} kez")
-
-user_stats = defaultdict(lambda: {'total': 0, 'error': 0, 'duration_sum': 0, 'duration_count': 0})
-for log in logs:
-    user_match = re.search(r"USER=([^;]+);", log)
-    user = user_match.group(1) if user_match else None
-    if user:
-        user_stats[user]['total'] += 1
-        if is_error_log(log):
-            user_stats[user]['error'] += 1
-        dur = extract_duration(log)
-        if dur is not None:
-            user_stats[user]['duration_sum'] += dur
-            user_stats[user]['duration_count'] += 1
-if user_stats:
-    print("[EK ANALİZ] Kullanıcıya özel istatistikler:")
-    for user, stats in user_stats.items():
-        avg_dur = stats['duration_sum']/stats['duration_count'] if stats['duration_count'] else 0
-        print(f"  {user}: Toplam={stats['total']}, Hata={stats['error']}, Ortalama DURATION={avg_dur:.2f} ms")
-else:
-    print("[EK ANALİZ] Kullanıcı bilgisi bulunamadı.")
-
-time_series = defaultdict(lambda: {'log': 0, 'error': 0})
-for log in logs:
-    ts = extract_timestamp(log)
-    if ts:
-        bucket = ts.replace(second=0, microsecond=0)
-        time_series[bucket]['log'] += 1
-        if is_error_log(log):
-            time_series[bucket]['error'] += 1
-if time_series:
-    buckets = sorted(time_series.keys())
-    log_counts = [time_series[b]['log'] for b in buckets]
-    error_counts = [time_series[b]['error'] for b in buckets]
-    plt.figure(figsize=(10,5))
-    plt.plot(buckets, log_counts, label='Log Sayısı')
-    plt.plot(buckets, error_counts, label='Hata Sayısı')
-    plt.xlabel('Zaman (dakika)')
-    plt.ylabel('Adet')
-    plt.title('Zaman Serisi: Log ve Hata Sayısı')
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig('results/log_error_timeseries.png')
-    print("[EK ANALİZ] Zaman serisi grafiği 'results/log_error_timeseries.png' olarak kaydedildi.")
-
-if time_series:
-    log_mean = sum(log_counts)/len(log_counts)
-    log_std = (sum((x-log_mean)**2 for x in log_counts)/len(log_counts))**0.5
-    anomaly_threshold = log_mean + 3*log_std
-    anomalies = [(b, c) for b, c in zip(buckets, log_counts) if c > anomaly_threshold]
-    if anomalies:
-        print("[EK ANALİZ] Anomali tespiti: Beklenenden çok fazla log üretilen zaman dilimleri:")
-        for b, c in anomalies:
-            print(f"  {b}: {c} log (ortalama+3σ üstü)")
-    else:
-        print("[EK ANALİZ] Log yoğunluğunda belirgin bir anomali tespit edilmedi.")
-    error_ratios = [e/l if l else 0 for e, l in zip(error_counts, log_counts)]
-    error_mean = sum(error_ratios)/len(error_ratios)
-    error_std = (sum((x-error_mean)**2 for x in error_ratios)/len(error_ratios))**0.5
-    error_anomaly_threshold = error_mean + 3*error_std
-    error_anomalies = [(b, r) for b, r in zip(buckets, error_ratios) if r > error_anomaly_threshold]
-    if error_anomalies:
-        print("[EK ANALİZ] Hata oranı anomalisi: Beklenenden yüksek hata oranı olan zaman dilimleri:")
-        for b, r in error_anomalies:
-            print(f"  {b}: {r*100:.2f}% hata oranı (ortalama+3σ üstü)")
-    else:
-        print("[EK ANALİZ] Hata oranında belirgin bir anomali tespit edilmedi.")
-
-error_messages = []
-for log in logs:
-    match = re.search(r"ERROR=([^;]+);", log)
-    if match:
-        error_messages.append(match.group(1).strip())
-
-from collections import defaultdict
-
-time_series = defaultdict(lambda: 0)
-for log in logs:
-    ts = extract_timestamp(log)
-    if ts:
-        bucket = ts.replace(second=0, microsecond=0)
-        time_series[bucket] += 1
-
-if os.path.exists("anomaly_config.json"):
-    with open("anomaly_config.json", "r") as f:
-        anomaly_config = json.load(f)
-    window_size = anomaly_config.get("window", 5)
-    threshold = anomaly_config.get("threshold", 3.0)
-else:
-    window_size = 5
-    threshold = 3.0
-
-anomalies = anomaly_agent.detect_time_series_anomalies(time_series, window=window_size, threshold=threshold)
-error_message_anomalies = anomaly_agent.detect_error_message_anomalies(error_messages, min_count=10)
-
-if anomalies:
-    print("[AGENT] Zaman serisi anomalileri:")
-    for ts, count in anomalies:
-        print(f"  {ts}: {count} log (kayan pencere anomali)")
-else:
-    print("[AGENT] Zaman serisinde anomali yok.")
-
-if error_message_anomalies:
-    print("[AGENT] Hata mesajı anomalileri:")
-    for msg, count in error_message_anomalies:
-        print(f"  {msg}: {count} kez")
-else:
-    print("[AGENT] Hata mesajı anomalisi yok.")
-
-from collections import defaultdict
-import numpy as np
-
-duration_series = defaultdict(list)
-for log in logs:
-    ts = extract_timestamp(log)
-    dur = extract_duration(log)
-    if ts and dur is not None:
-        bucket = ts.replace(second=0, microsecond=0)  # dakikalık
-        duration_series[bucket].append(dur)
-
-avg_duration_per_bucket = {b: sum(lst)/len(lst) for b, lst in duration_series.items() if lst}
-
-buckets = sorted(avg_duration_per_bucket.keys())
-values = np.array([avg_duration_per_bucket[b] for b in buckets])
-
-duration_anomalies = []
-for i in range(window_size-1, len(values)):
-    window_slice = values[i-window_size+1:i+1]
-    mean = np.mean(window_slice)
-    std = np.std(window_slice)
-    if std == 0:
-        continue
-    if values[i] > mean + threshold * std:
-        duration_anomalies.append((buckets[i], values[i]))
-
-if duration_anomalies:
-    print("[DURATION ANOMALİ] Ortalama işlem süresi anomalileri:")
-    for ts, val in duration_anomalies:
-        print(f"  {ts}: {val:.2f} ms (ortalama+{threshold}σ üstü)")
-else:
-    print("[DURATION ANOMALİ] Anomali tespit edilmedi.")
-
-report_data = {
-    "error_messages": dict(Counter(error_messages)),
-    "anomalies": [f"{ts}: {count} log (kayan pencere anomali)" for ts, count in anomalies],
-    "error_message_anomalies": [f"{msg}: {count} kez" for msg, count in error_message_anomalies],
-    "duration_anomalies": [f"{ts}: {val:.2f} ms (ortalama+{threshold}σ üstü)" for ts, val in duration_anomalies],
-}
-
-import os
-report_path = "results/report.json"
-if os.path.exists(report_path):
-    import json
-    with open(report_path, "r") as f:
-        old_report = json.load(f)
-    old_report.update(report_data)
-    with open(report_path, "w") as f:
-        json.dump(old_report, f, indent=2)
-else:
-    with open(report_path, "w") as f:
-        json.dump(report_data, f, indent=2)
+if __name__ == "__main__":
+    analyze()
@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+
+from agents.backends import OllamaBackend
+from benchmarks.stub_server import StubOllamaServer
+
+PROMPT = "Log: {log_line}\n{fields}"
+BATCH_PROMPT = "{count} satır:\n{log_lines}\n{fields}"
+LINE = "2024-01-01 10:00:00 | REQUESTID=1 | ERROR=Timeout on db 42 | DURATION=120ms"
+
+
+class OllamaStreamTest(unittest.TestCase):
+    def _backend(self, server, **options):
+        return OllamaBackend(PROMPT, BATCH_PROMPT, base_url=server.url, max_connections=1, **options)
+
+    def test_connection_reused_when_model_stops_after_value(self):
+        with StubOllamaServer(latency_ms=0, trailing="\n") as server:
+            backend = self._backend(server)
+            try:
+                for _ in range(20):
+                    self.assertIn("event_type", backend.invoke(LINE))
+            finally:
+                backend.close()
+        self.assertEqual(server.requests, 20)
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(backend.early_stops, 0)
+
+    def test_async_connection_reused(self):
+        async def run(backend):
+            try:
+                for _ in range(20):
+                    await backend.ainvoke_batch([LINE, LINE])
+            finally:
+                await backend.aclose()
+
+        with StubOllamaServer(latency_ms=0, trailing="") as server:
+            backend = self._backend(server)
+            asyncio.run(run(backend))
+            backend.close()
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(backend.early_stops, 0)
+
+    def test_stream_cut_when_model_keeps_talking(self):
+        with StubOllamaServer(latency_ms=0) as server:
+            backend = self._backend(server, drain_lines=4)
+            try:
+                for _ in range(5):
+                    self.assertIn("event_type", backend.invoke(LINE))
+            finally:
+                backend.close()
+        self.assertEqual(backend.early_stops, 5)
+        self.assertEqual(server.connections, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()